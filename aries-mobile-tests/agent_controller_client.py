@@ -8,7 +8,15 @@ from aiohttp import (
     ClientTimeout,
 )
 import json
+import atexit
+import random
+import threading
+import time
+from collections import deque
 from time import sleep
+from urllib.parse import urlsplit
+from aiohttp import TCPConnector
+from decouple import config
 
 
 ######################################################################
@@ -40,31 +48,299 @@ def run_coroutine_with_kwargs(coroutine, *args, **kwargs):
         loop.close()
 
 
+######################################################################
+# persistent agent controller transport
+######################################################################
+
+class AgentControllerTransport:
+    """
+    Long lived transport shared by all agent controller calls.
+    Owns one background event loop and one pooled, keep-alive ClientSession
+    per agent endpoint (scheme://host:port), so repeated calls to the same
+    backchannel reuse open TCP/TLS connections instead of reconnecting.
+    """
+
+    def __init__(self, connection_limit=100, connection_limit_per_host=10, keepalive_timeout=30.0, request_timeout=300.0):
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._loop = None
+        self._thread = None
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def configure(self, connection_limit=None, connection_limit_per_host=None, keepalive_timeout=None, request_timeout=None):
+        """change the connection settings. Open sessions are closed so the new settings apply to the next request"""
+        if connection_limit is not None:
+            self.connection_limit = connection_limit
+        if connection_limit_per_host is not None:
+            self.connection_limit_per_host = connection_limit_per_host
+        if keepalive_timeout is not None:
+            self.keepalive_timeout = keepalive_timeout
+        if request_timeout is not None:
+            self.request_timeout = request_timeout
+        if self.is_running():
+            self.run(self._close_sessions())
+
+    def is_running(self) -> bool:
+        return self._loop is not None and self._thread is not None and self._thread.is_alive()
+
+    @property
+    def loop(self):
+        """return the background event loop, starting it if needed"""
+        with self._lock:
+            if not self.is_running():
+                self._loop = asyncio.new_event_loop()
+                self._sessions = {}
+                self._thread = threading.Thread(target=self._run_loop, name="agent-controller-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def run(self, coroutine):
+        """run a coroutine on the background loop and block until it returns"""
+        loop = self.loop
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            raise RuntimeError("AgentControllerTransport.run() cannot be called from the transport's own event loop, await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    def get_session(self, url) -> ClientSession:
+        """return the pooled session for the endpoint of the given url. Must be called on the transport loop"""
+        parts = urlsplit(url)
+        endpoint = f"{parts.scheme}://{parts.netloc}"
+        session = self._sessions.get(endpoint)
+        if session is None or session.closed:
+            connector = TCPConnector(
+                limit=self.connection_limit,
+                limit_per_host=self.connection_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = ClientSession(connector=connector, timeout=ClientTimeout(total=self.request_timeout))
+            self._sessions[endpoint] = session
+        return session
+
+    def owns_running_loop(self) -> bool:
+        try:
+            return self._loop is not None and asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def _close_sessions(self):
+        sessions = list(self._sessions.values())
+        self._sessions = {}
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+    def close(self):
+        """close all pooled sessions and stop the background loop"""
+        with self._lock:
+            if not self.is_running():
+                return
+            loop = self._loop
+            thread = self._thread
+            asyncio.run_coroutine_threadsafe(self._close_sessions(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+            self._loop = None
+            self._thread = None
+
+
+agent_controller_transport = AgentControllerTransport(
+    connection_limit=config('AGENT_CONTROLLER_CONNECTION_LIMIT', default=100, cast=int),
+    connection_limit_per_host=config('AGENT_CONTROLLER_CONNECTION_LIMIT_PER_HOST', default=10, cast=int),
+    keepalive_timeout=config('AGENT_CONTROLLER_KEEPALIVE_TIMEOUT', default=30.0, cast=float),
+    request_timeout=config('AGENT_CONTROLLER_REQUEST_TIMEOUT', default=300.0, cast=float),
+)
+atexit.register(agent_controller_transport.close)
+
+
+def run_on_agent_controller_loop(coroutine, *args, **kwargs):
+    """run a coroutine function on the shared agent controller loop and return its result"""
+    return agent_controller_transport.run(coroutine(*args, **kwargs))
+
+
 async def make_agent_controller_request(
     method, path, data=None, text=False, params=None
 ) -> (int, str):
     params = {k: v for (k, v) in (params or {}).items() if v is not None}
-    client_session: ClientSession = ClientSession()
-    async with client_session.request(
-        method, path, json=data, params=params
-    ) as resp:
-        resp_status = resp.status
-        resp_text = await resp.text()
-        await client_session.close()
-        return (resp_status, resp_text)
+    if agent_controller_transport.owns_running_loop():
+        # Pooled keep-alive session, left open for the next request
+        client_session = agent_controller_transport.get_session(path)
+        async with client_session.request(
+            method, path, json=data, params=params
+        ) as resp:
+            resp_status = resp.status
+            resp_text = await resp.text()
+            return (resp_status, resp_text)
+
+    # Called from some other event loop, use a one off session bound to that loop
+    async with ClientSession() as client_session:
+        async with client_session.request(
+            method, path, json=data, params=params
+        ) as resp:
+            resp_status = resp.status
+            resp_text = await resp.text()
+            return (resp_status, resp_text)
+
+
+######################################################################
+# idempotent GET cache
+######################################################################
+
+def _parse_topic_ttls(topic_ttls: str) -> dict:
+    """parse "topic=seconds,topic=seconds" into a dict"""
+    ttls = {}
+    for item in topic_ttls.split(","):
+        if "=" in item:
+            (topic, ttl) = item.split("=", 1)
+            ttls[topic.strip()] = float(ttl)
+    return ttls
+
+
+class SingleFlightCache:
+    """
+    TTL cache where concurrent callers asking for a key that is not cached share one in flight fetch.
+    Must be used from the agent controller loop.
+    """
 
+    def __init__(self):
+        self._entries = {}
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.saved_latency = 0.0
 
-def agent_controller_GET(url, topic, operation=None, id=None) -> (int, str):
+    async def get_or_fetch(self, key, fetch, ttl, keep=None):
+        """return the cached value for key, or call fetch() once for all waiting callers and cache its value for ttl seconds if keep(value)"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            (expires_at, value, latency) = entry
+            if time.monotonic() < expires_at:
+                self.hits += 1
+                self.saved_latency += latency
+                return value
+            del self._entries[key]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            # the fetch this caller would have made costs about as long as the shared one took
+            self.coalesced += 1
+            (value, latency) = await asyncio.shield(in_flight)
+            self.saved_latency += latency
+            return value
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        started = time.monotonic()
+        try:
+            value = await fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody else may be waiting on it, don't warn about an unretrieved exception
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+        latency = time.monotonic() - started
+        if keep is None or keep(value):
+            self._entries[key] = (time.monotonic() + ttl, value, latency)
+        future.set_result((value, latency))
+        return value
+
+    def clear(self):
+        self._entries = {}
+
+
+class AgentControllerCache(SingleFlightCache):
+    """
+    TTL cache for agent controller GETs that return the same answer for the whole run, like the
+    public DID. Entries are keyed on (endpoint, topic, operation, id) and only topics with a TTL are
+    cached. Concurrent callers asking for the same key share one in flight request. Only 200
+    responses are kept, and writes to a topic drop what they change, see INVALIDATED_BY_WRITES.
+    Must be used from the agent controller loop.
+    """
+
+    def __init__(self, topic_ttls=None):
+        super().__init__()
+        self.topic_ttls = topic_ttls if topic_ttls is not None else {"did": 3600.0}
+
+    def is_cached_topic(self, topic) -> bool:
+        return self.topic_ttls.get(topic, 0) > 0
+
+    async def get(self, key, fetch) -> (int, str):
+        """return the cached response for key, or call fetch() once for all waiting callers"""
+        (endpoint, topic, operation, id) = key
+        return await self.get_or_fetch(key, fetch, self.topic_ttls[topic], keep=lambda response: response[0] == 200)
+
+    def invalidate(self, endpoint=None, topic=None, operation=None, id=None):
+        """drop every entry matching the given parts, None matches anything"""
+        wanted = (endpoint, topic, operation, id)
+        for key in list(self._entries):
+            if all(part is None or part == key_part for (part, key_part) in zip(wanted, key)):
+                self._entries.pop(key, None)
+
+    def invalidate_after_write(self, topic):
+        """drop the cached topics a POST or DELETE to topic changes, on every agent as both ends of a connection change"""
+        for cached_topic in INVALIDATED_BY_WRITES.get(topic, ()):
+            self.invalidate(topic=cached_topic)
+
+    def report(self) -> str:
+        requests = self.hits + self.misses + self.coalesced
+        return (
+            f"Agent controller GET cache: {requests} cacheable requests, {self.hits} hits, "
+            f"{self.coalesced} coalesced, {self.misses} misses, {self.saved_latency:.2f}s of agent latency saved"
+        )
+
+
+# Cached topics that a POST or DELETE to a topic changes, connections come and go as invitations are used and removed
+INVALIDATED_BY_WRITES = {
+    "connection": ("active-connection",),
+    "out-of-band": ("active-connection",),
+    "did-exchange": ("active-connection",),
+}
+
+# active-connection can be cached too, eg "did=3600,active-connection=300", it is dropped whenever a connection changes
+agent_controller_cache = AgentControllerCache(
+    config('AGENT_CONTROLLER_CACHE_TTLS', default="did=3600", cast=_parse_topic_ttls)
+)
+
+
+def _agent_controller_GET_url(url, topic, operation=None, id=None) -> str:
     agent_url = url + topic
     if operation:
         agent_url = agent_url + "/" + operation
     if id:
         agent_url = agent_url  + "/" + id
-    (resp_status, resp_text) = run_coroutine_with_kwargs(make_agent_controller_request, "GET", agent_url)
+    return agent_url
+
+
+async def agent_controller_GET_async(url, topic, operation=None, id=None, use_cache=True) -> (int, str):
+    agent_url = _agent_controller_GET_url(url, topic, operation, id)
+    if use_cache and agent_controller_cache.is_cached_topic(topic):
+        return await agent_controller_cache.get(
+            (url, topic, operation, id), lambda: make_agent_controller_request("GET", agent_url)
+        )
+    return await make_agent_controller_request("GET", agent_url)
+
+
+def agent_controller_GET(url, topic, operation=None, id=None, use_cache=True) -> (int, str):
+    (resp_status, resp_text) = run_on_agent_controller_loop(agent_controller_GET_async, url, topic, operation, id, use_cache)
     return (resp_status, resp_text)
 
 
-def agent_controller_POST(url, topic, operation=None, id=None, data=None, wrap_data_with_data=True) -> (int, str):
+async def agent_controller_POST_async(url, topic, operation=None, id=None, data=None, wrap_data_with_data=True) -> (int, str):
     agent_url = url + topic + "/"
     payload = {}
     if data:
@@ -80,55 +356,334 @@ def agent_controller_POST(url, topic, operation=None, id=None, data=None, wrap_d
         else:
             payload["id"] = id
 
-    (resp_status, resp_text) = run_coroutine_with_kwargs(make_agent_controller_request, "POST", agent_url, data=payload)
+    try:
+        return await make_agent_controller_request("POST", agent_url, data=payload)
+    finally:
+        agent_controller_cache.invalidate_after_write(topic)
+
+
+def agent_controller_POST(url, topic, operation=None, id=None, data=None, wrap_data_with_data=True) -> (int, str):
+    (resp_status, resp_text) = run_on_agent_controller_loop(
+        agent_controller_POST_async, url, topic, operation=operation, id=id, data=data, wrap_data_with_data=wrap_data_with_data
+    )
     return (resp_status, resp_text)
 
-def agent_controller_DELETE(url, topic, id=None, data=None) -> (int, str):
+
+async def agent_controller_DELETE_async(url, topic, id=None, data=None) -> (int, str):
     agent_url = url + topic + "/"
     if id:
         agent_url = agent_url + id
-    (resp_status, resp_text) = run_coroutine_with_kwargs(make_agent_controller_request, "DELETE", agent_url)
+    try:
+        return await make_agent_controller_request("DELETE", agent_url)
+    finally:
+        agent_controller_cache.invalidate_after_write(topic)
+
+
+def agent_controller_DELETE(url, topic, id=None, data=None) -> (int, str):
+    (resp_status, resp_text) = run_on_agent_controller_loop(agent_controller_DELETE_async, url, topic, id=id, data=data)
     return (resp_status, resp_text)
 
+
+######################################################################
+# agent state waiting
+######################################################################
+
+class AgentStateWaitResult:
+    """Outcome of waiting on an agent controller resource"""
+
+    def __init__(self, matched=False, resp_status=None, resp_text=None, resp_json=None, attempts=0, elapsed=0.0):
+        self.matched = matched
+        self.resp_status = resp_status
+        self.resp_text = resp_text
+        self.resp_json = resp_json
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+    def __bool__(self):
+        return self.matched
+
+
+async def wait_for_agent_state_async(
+    url, topic, predicate, operation=None, id=None, timeout=20.0, initial_interval=0.25, max_interval=2.0, backoff=2.0, jitter=0.2
+) -> AgentStateWaitResult:
+    """
+    Poll an agent controller GET until predicate(resp_json) is true or the wall clock deadline passes.
+    The first check happens immediately, then the wait between checks grows by the backoff factor up
+    to max_interval, with +/- jitter (a fraction of the interval) so concurrent waiters spread out.
+    timeout is in seconds.
+    """
+    deadline = time.monotonic() + timeout
+    start = time.monotonic()
+    interval = initial_interval
+    result = AgentStateWaitResult()
+    while True:
+        result.attempts += 1
+        try:
+            (result.resp_status, result.resp_text) = await agent_controller_GET_async(url, topic, operation=operation, id=id, use_cache=False)
+        except (ClientError, asyncio.TimeoutError) as e:
+            result.resp_status, result.resp_text = None, str(e)
+        if result.resp_status == 200:
+            try:
+                result.resp_json = json.loads(result.resp_text)
+            except ValueError:
+                result.resp_json = None
+            if result.resp_json is not None and predicate(result.resp_json):
+                result.matched = True
+                break
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        delay = interval * (1 + random.uniform(-jitter, jitter))
+        await asyncio.sleep(max(0, min(delay, remaining)))
+        interval = min(interval * backoff, max_interval)
+
+    result.elapsed = time.monotonic() - start
+    return result
+
+
+def wait_for_agent_state(url, topic, predicate, operation=None, id=None, timeout=20.0, initial_interval=0.25, max_interval=2.0, backoff=2.0, jitter=0.2) -> AgentStateWaitResult:
+    """blocking version of wait_for_agent_state_async, run on the shared agent controller loop"""
+    return run_on_agent_controller_loop(
+        wait_for_agent_state_async,
+        url,
+        topic,
+        predicate,
+        operation=operation,
+        id=id,
+        timeout=timeout,
+        initial_interval=initial_interval,
+        max_interval=max_interval,
+        backoff=backoff,
+        jitter=jitter,
+    )
+
+
 def expected_agent_state(agent_url, protocol_txt, thread_id, status_txt, wait_time=2.0, sleep_time=0.5):
-    sleep(sleep_time)
-    state = "None"
+    """
+    Return True once the agent reports one of the given states for the thread.
+    wait_time is the deadline in seconds and sleep_time the longest wait between checks.
+    """
     if type(status_txt) != list:
         status_txt = [status_txt]
     # "N/A" means that the controller can't determine the state - we'll treat this as a successful response
-    status_txt.append("N/A")
-    #for i in range(int(wait_time/sleep_time)):
-    for i in range(int(wait_time)):
-        (resp_status, resp_text) = agent_controller_GET(agent_url + "/agent/command/", protocol_txt, id=thread_id)
-        if resp_status == 200:
-            resp_json = json.loads(resp_text)
-            state = resp_json["state"]
-            if state in status_txt:
-                return True
-        sleep(sleep_time)
+    status_txt = status_txt + ["N/A"]
+
+    result = wait_for_agent_state(
+        agent_url + "/agent/command/",
+        protocol_txt,
+        lambda resp_json: resp_json.get("state") in status_txt,
+        id=thread_id,
+        timeout=wait_time,
+        max_interval=sleep_time,
+    )
+    if not result:
+        state = result.resp_json.get("state") if result.resp_json else "None"
+        print("From", agent_url, "Expected state", status_txt, "but received", state, ", with a response status of", result.resp_status)
+    return result.matched
 
 def expected_agent_proof_state(agent_url, thread_id, status_txt, wait_time=2.0, sleep_time=0.5):
-    sleep(sleep_time)
-    verified = "False"
+    """
+    Return True once the agent reports the proof for the thread as verified with one of the given values.
+    wait_time is the deadline in seconds and sleep_time the longest wait between checks.
+    """
     if type(status_txt) != list:
         status_txt = [status_txt]
-    for i in range(int(wait_time)):
-        (resp_status, resp_text) = agent_controller_GET(agent_url + "/agent/command/", "proof", id=thread_id)
-        if resp_status == 200:
-            resp_json = json.loads(resp_text)
-            # if "verified" is not in resp_json, then it hasn't been verified yet, loop.
-            if "verified" in resp_json:
-                verified = resp_json["verified"]
-                if verified in status_txt:
-                    return True
-            else:
-                print("Proof not verified on attempt", i, "of", int(wait_time), "sleeping for", sleep_time, "seconds")
-                # print formated json 
-                print(json.dumps(resp_json, indent=4))
-        sleep(sleep_time)
 
-    print("From", agent_url, "Expected state", status_txt, "but received", verified, ", with a response status of", resp_status)
-    return False
+    # if "verified" is not in resp_json, then it hasn't been verified yet, keep waiting.
+    result = wait_for_agent_state(
+        agent_url + "/agent/command/",
+        "proof",
+        lambda resp_json: resp_json.get("verified") in status_txt,
+        id=thread_id,
+        timeout=wait_time,
+        max_interval=sleep_time,
+    )
+    if not result:
+        verified = result.resp_json.get("verified", "False") if result.resp_json else "False"
+        print("From", agent_url, "Expected state", status_txt, "but received", verified, ", with a response status of", result.resp_status, "after", result.attempts, "attempts")
+        if result.resp_json:
+            print(json.dumps(result.resp_json, indent=4))
+    return result.matched
+
+######################################################################
+# webhook listener
+######################################################################
+
+class AgentWebhookListener:
+    """
+    Optional embedded receiver for ACA-Py style webhooks (POST <prefix>/topic/<topic>/).
+    Agent interfaces register under an agent id and get back the webhook url their agent
+    should post to; waiters are then resolved as soon as a matching event is pushed instead
+    of polling the backchannel. Runs on the shared agent controller loop.
+    """
+
+    def __init__(self, transport, host="0.0.0.0", port=0, public_url=None, history_size=500):
+        self._transport = transport
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self._history_size = history_size
+        self._events = {}
+        self._waiters = {}
+        self._runner = None
+
+    def is_running(self) -> bool:
+        return self._runner is not None
+
+    def start(self):
+        """start listening, returns the port that was bound"""
+        if not self.is_running():
+            self._transport.run(self._start())
+        return self.port
+
+    async def _start(self):
+        app = web.Application()
+        app.router.add_post("/topic/{topic}", self._handle_webhook)
+        app.router.add_post("/topic/{topic}/", self._handle_webhook)
+        app.router.add_post("/{agent_id}/topic/{topic}", self._handle_webhook)
+        app.router.add_post("/{agent_id}/topic/{topic}/", self._handle_webhook)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, self.host, self.port)
+        await site.start()
+        self.port = runner.addresses[0][1]
+        self._runner = runner
+
+    def stop(self):
+        if self.is_running() and self._transport.is_running():
+            self._transport.run(self._stop())
+        self._runner = None
+
+    async def _stop(self):
+        await self._runner.cleanup()
+        for waiters in self._waiters.values():
+            for (topics, predicate, future) in waiters:
+                if not future.done():
+                    future.cancel()
+        self._waiters = {}
+
+    def register(self, agent_id) -> str:
+        """register an agent and return the webhook url it should be configured with"""
+        self._events.setdefault(agent_id, deque(maxlen=self._history_size))
+        self._waiters.setdefault(agent_id, [])
+        base_url = self.public_url or f"http://localhost:{self.port}"
+        return f"{base_url.rstrip('/')}/{agent_id}"
+
+    def is_registered(self, agent_id) -> bool:
+        return self.is_running() and agent_id in self._events
+
+    async def _handle_webhook(self, request):
+        agent_id = request.match_info.get("agent_id", "default")
+        topic = request.match_info["topic"]
+        try:
+            payload = await request.json()
+        except ValueError:
+            return web.Response(status=400, text="webhook payload must be json")
+        self._dispatch(agent_id, topic, payload)
+        return web.Response(status=200)
+
+    def _dispatch(self, agent_id, topic, payload):
+        self._events.setdefault(agent_id, deque(maxlen=self._history_size)).append((topic, payload))
+        waiters = self._waiters.get(agent_id, [])
+        for waiter in list(waiters):
+            (topics, predicate, future) = waiter
+            if future.done():
+                waiters.remove(waiter)
+            elif topic in topics and predicate(payload):
+                future.set_result(payload)
+                waiters.remove(waiter)
+
+    async def wait_for_event_async(self, agent_id, topics, predicate, timeout=20.0):
+        """return the first payload on one of the topics matching predicate, including already received events, or None on timeout"""
+        if type(topics) != list:
+            topics = [topics]
+        for (topic, payload) in reversed(self._events.get(agent_id, [])):
+            if topic in topics and predicate(payload):
+                return payload
+        future = asyncio.get_running_loop().create_future()
+        waiter = (topics, predicate, future)
+        self._waiters.setdefault(agent_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if waiter in self._waiters.get(agent_id, []):
+                self._waiters[agent_id].remove(waiter)
+
+    def wait_for_event(self, agent_id, topics, predicate, timeout=20.0):
+        return self._transport.run(self.wait_for_event_async(agent_id, topics, predicate, timeout))
+
+
+agent_webhook_listener = AgentWebhookListener(
+    agent_controller_transport,
+    host=config('AGENT_WEBHOOK_LISTENER_HOST', default="0.0.0.0"),
+    port=config('AGENT_WEBHOOK_LISTENER_PORT', default=0, cast=int),
+    public_url=config('AGENT_WEBHOOK_PUBLIC_URL', default=None),
+)
+atexit.register(agent_webhook_listener.stop)
+
+
+def webhook_listener_enabled() -> bool:
+    """the listener is opt in, it only runs when a port has been configured"""
+    return config('AGENT_WEBHOOK_LISTENER_PORT', default=0, cast=int) != 0
+
+
+async def wait_for_agent_event_or_state_async(
+    agent_id, event_topics, event_predicate, url, topic, state_predicate, id=None, timeout=20.0, poll_interval=5.0
+) -> AgentStateWaitResult:
+    """
+    Wait for a pushed webhook event, with a slow poll of the backchannel running alongside in case
+    the event never arrives. Whichever matches first wins. Without a registered listener this is a
+    plain wait_for_agent_state_async.
+    """
+    if not agent_webhook_listener.is_registered(agent_id):
+        return await wait_for_agent_state_async(url, topic, state_predicate, id=id, timeout=timeout)
+
+    start = time.monotonic()
+    event_task = asyncio.ensure_future(
+        agent_webhook_listener.wait_for_event_async(agent_id, event_topics, event_predicate, timeout)
+    )
+    poll_task = asyncio.ensure_future(
+        wait_for_agent_state_async(url, topic, state_predicate, id=id, timeout=timeout, initial_interval=poll_interval, max_interval=poll_interval)
+    )
+    pending = {event_task, poll_task}
+    result = AgentStateWaitResult()
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if event_task in done and event_task.result() is not None:
+                result = AgentStateWaitResult(matched=True, resp_json=event_task.result())
+                break
+            if poll_task in done:
+                result = poll_task.result()
+                if result:
+                    break
+    finally:
+        for task in pending:
+            task.cancel()
+    result.elapsed = time.monotonic() - start
+    return result
+
+
+def wait_for_agent_event_or_state(
+    agent_id, event_topics, event_predicate, url, topic, state_predicate, id=None, timeout=20.0, poll_interval=5.0
+) -> AgentStateWaitResult:
+    """blocking version of wait_for_agent_event_or_state_async"""
+    return run_on_agent_controller_loop(
+        wait_for_agent_event_or_state_async,
+        agent_id,
+        event_topics,
+        event_predicate,
+        url,
+        topic,
+        state_predicate,
+        id=id,
+        timeout=timeout,
+        poll_interval=poll_interval,
+    )
+
 
 def check_if_already_connected(context, sender, receiver):
     # get receiver DID
@@ -3,29 +3,39 @@ Base Class for actual AATH agents
 """
 
 from agent_factory.issuer_agent_interface import IssuerAgentInterface
+from agent_factory.aath.aath_invitation_pool import AATHInvitationPool, aath_invitation_pool_size, aath_invitation_pool_ttl
+import asyncio
 import json
 from agent_test_utils import get_qr_code_from_invitation
-from agent_controller_client import agent_controller_GET, agent_controller_POST, expected_agent_state, setup_already_connected
+from agent_controller_client import agent_controller_POST_async, agent_webhook_listener, wait_for_agent_event_or_state_async
 
 
 class AATHAgentInterface():
 
     _oob = False
+    _webhook_agent_id = None
+    _invitation_pool = None
     name = str
 
-    def create_invitation_util(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
-        """create an invitation and return the json back to the caller """
-        self._oob = oob
-        if self._oob is True:
+    def _get_invitation_pool(self) -> AATHInvitationPool:
+        if self._invitation_pool is None:
+            self._invitation_pool = AATHInvitationPool(
+                self._new_invitation_async, size=aath_invitation_pool_size(), ttl=aath_invitation_pool_ttl()
+            )
+        return self._invitation_pool
+
+    async def _new_invitation_async(self, oob, qr_code_border):
+        """create an invitation on the agent and render its QR code, without touching this interface's state"""
+        if oob is True:
             data = {"use_public_did": False}
-            (resp_status, resp_text) = agent_controller_POST(
+            (resp_status, resp_text) = await agent_controller_POST_async(
                 self.endpoint + "/agent/command/",
                 "out-of-band",
                 operation="send-invitation-message",
                 data=data,
             )
         else:
-            (resp_status, resp_text) = agent_controller_POST(
+            (resp_status, resp_text) = await agent_controller_POST_async(
                 self.endpoint + "/agent/command/", "connection", operation="create-invitation"
             )
 
@@ -33,12 +43,34 @@ class AATHAgentInterface():
             raise Exception(
                 f"Call to create connection invitation failed: {resp_status}; {resp_text}"
             )
-        else:
-            self.invitation_json = json.loads(resp_text)
-            if "label" in self.invitation_json["invitation"]:
-                self.name = self.invitation_json["invitation"]["label"]
+        invitation_json = json.loads(resp_text)
+        # Rendering the QR code is CPU work, keep it off the agent controller loop
+        qrimage = await asyncio.get_running_loop().run_in_executor(
+            None, get_qr_code_from_invitation, invitation_json, False, False, qr_code_border
+        )
+        return (invitation_json, qrimage)
+
+    async def create_invitation_util_async(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
+        """create an invitation and return the json back to the caller """
+        self._oob = oob
+        (self.invitation_json, qrimage) = await self._get_invitation_pool().pop(oob, qr_code_border)
+        if "label" in self.invitation_json["invitation"]:
+            self.name = self.invitation_json["invitation"]["label"]
+        if print_qrcode or save_qrcode:
             qrimage = get_qr_code_from_invitation(self.invitation_json, print_qrcode, save_qrcode, qr_code_border)
-            return qrimage
+        return qrimage
+
+    def reset_util(self):
+        """forget the last feature's invitation and throw away the pooled invitations, must run on the agent controller loop"""
+        self._oob = False
+        for attribute in ("invitation_json", "name"):
+            self.__dict__.pop(attribute, None)
+        if self._invitation_pool is not None:
+            self._invitation_pool.cancel()
+
+    def add_invitation_ready_listener(self, listener):
+        """have listener, a coroutine function (invitation_json, qrimage), awaited for each invitation pre-created for the pool"""
+        self._get_invitation_pool().add_ready_listener(listener)
 
     def get_name(self):
         if self.name:
@@ -46,25 +78,51 @@ class AATHAgentInterface():
         else:
             raise Exception("Agent name not set")
 
-    def connected_util(self):
+    def register_webhook_listener(self, agent_id) -> str:
+        """have state changes for this agent pushed by the webhook listener, returns the webhook url to configure the agent with"""
+        self._webhook_agent_id = agent_id
+        return agent_webhook_listener.register(agent_id)
+
+    async def connected_util_async(self, wait_time=10.0):
         """return True/False indicating if this issuer is connected to the wallet holder """
 
         # If OOB then make a call to get the connection id from the webhook. 
         if self._oob == True:
             # Get the responders's connection id from the above request's response webhook in the backchannel
             invitation_id = self.invitation_json["invitation"]["@id"]
-            (resp_status, resp_text) = agent_controller_GET(
-                self.endpoint  + "/agent/response/", "did-exchange", id=invitation_id
+            result = await wait_for_agent_event_or_state_async(
+                self._webhook_agent_id,
+                ["connections", "out_of_band"],
+                lambda payload: "connection_id" in payload and invitation_id in (payload.get("invitation_msg_id"), payload.get("invi_msg_id")),
+                self.endpoint + "/agent/response/",
+                "did-exchange",
+                lambda resp_json: "connection_id" in resp_json,
+                id=invitation_id,
+                timeout=wait_time,
             )
-            if resp_status != 200:
+            if not result:
                 raise Exception(
-                    f"Call get the connection id from the OOB connection failed: {resp_status}; {resp_text}"
+                    f"Call get the connection id from the OOB connection failed: {result.resp_status}; {result.resp_text}"
                 )
             else:
-                resp_json = json.loads(resp_text)
-                connection_id = resp_json["connection_id"]
+                connection_id = result.resp_json["connection_id"]
                 self.invitation_json["connection_id"] = connection_id
         else:
             connection_id = self.invitation_json['connection_id']
-        return expected_agent_state(self.endpoint, "connection", connection_id, "complete", sleep_time=2.0)
+
+        # "N/A" means that the controller can't determine the state - we'll treat this as a successful response
+        result = await wait_for_agent_event_or_state_async(
+            self._webhook_agent_id,
+            ["connections"],
+            lambda payload: payload.get("connection_id") == connection_id and (payload.get("state") in ["active", "completed"] or payload.get("rfc23_state") == "completed"),
+            self.endpoint + "/agent/command/",
+            "connection",
+            lambda resp_json: resp_json.get("state") in ["complete", "N/A"],
+            id=connection_id,
+            timeout=wait_time,
+        )
+        if not result:
+            state = result.resp_json.get("state") if result.resp_json else "None"
+            print("From", self.endpoint, "Expected state complete but received", state, ", with a response status of", result.resp_status)
+        return result.matched
 
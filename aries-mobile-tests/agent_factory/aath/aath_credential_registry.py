@@ -0,0 +1,68 @@
+"""
+Persistent on disk registry of the schemas and credential definitions an AATH issuer has already
+written to the ledger, so they can be reused across features and runs instead of being recreated.
+"""
+
+import json
+import os
+import threading
+from decouple import config
+
+
+class AATHCredentialRegistry():
+
+    _registry_file_path: str
+
+    def __init__(self, registry_file_path: str):
+        self._registry_file_path = registry_file_path
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(issuer_did, schema_name, schema_version, revocable) -> str:
+        revocation = "revocable" if revocable else "non_revocable"
+        return f"{issuer_did}:{schema_name}:{schema_version}:{revocation}"
+
+    def _load(self) -> dict:
+        try:
+            with open(self._registry_file_path) as registry_file:
+                return json.load(registry_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save(self, registry: dict):
+        registry_dir = os.path.dirname(self._registry_file_path)
+        if registry_dir:
+            os.makedirs(registry_dir, exist_ok=True)
+        # write to a temp file and swap it in so a concurrent reader never sees a partial file
+        tmp_file_path = f"{self._registry_file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file_path, "w") as registry_file:
+            json.dump(registry, registry_file, indent=4)
+        os.replace(tmp_file_path, self._registry_file_path)
+
+    def lookup(self, issuer_did, schema_name, schema_version, revocable) -> dict:
+        """return the registered schema_id and credential_definition_id, or None"""
+        with self._lock:
+            return self._load().get(self._key(issuer_did, schema_name, schema_version, revocable))
+
+    def record(self, issuer_did, schema_name, schema_version, revocable, schema_id, credential_definition_id):
+        with self._lock:
+            registry = self._load()
+            registry[self._key(issuer_did, schema_name, schema_version, revocable)] = {
+                "schema_id": schema_id,
+                "credential_definition_id": credential_definition_id,
+            }
+            self._save(registry)
+
+    def remove(self, issuer_did, schema_name, schema_version, revocable):
+        with self._lock:
+            registry = self._load()
+            if registry.pop(self._key(issuer_did, schema_name, schema_version, revocable), None) is not None:
+                self._save(registry)
+
+
+aath_credential_registry = AATHCredentialRegistry(
+    config(
+        'AATH_CREDENTIAL_REGISTRY_FILE',
+        default=os.path.join(os.path.expanduser("~"), ".aries-mobile-test-harness", "aath_credential_registry.json"),
+    )
+)
@@ -0,0 +1,77 @@
+"""
+Pool of ready to use connection invitations, with their QR codes already rendered, for AATH agents.
+A step that needs an invitation pops one and the pool refills itself in the background on the
+agent controller loop, so the device is not left waiting on the agent and the QR rendering.
+"""
+
+import asyncio
+import time
+from decouple import config
+
+
+class AATHInvitationPool():
+
+    def __init__(self, create_invitation, size=1, ttl=300.0):
+        """create_invitation is a coroutine function (oob, qr_code_border) -> (invitation_json, qrimage)"""
+        self._create_invitation = create_invitation
+        self.size = size
+        self.ttl = ttl
+        self._ready = {}
+        self._refills = {}
+        self._ready_listeners = []
+
+    def add_ready_listener(self, listener):
+        """listener is a coroutine function (invitation_json, qrimage) awaited for each invitation added to the pool"""
+        self._ready_listeners.append(listener)
+
+    async def pop(self, oob=False, qr_code_border=40):
+        """return (invitation_json, qrimage), from the pool if a fresh one is ready, then top the pool up"""
+        key = (oob, qr_code_border)
+        ready = self._ready.setdefault(key, [])
+        now = time.monotonic()
+        # Drop invitations that have been sitting around too long to trust
+        ready[:] = [(expires_at, invitation) for (expires_at, invitation) in ready if expires_at > now]
+        if ready:
+            (expires_at, invitation) = ready.pop(0)
+        else:
+            invitation = await self._create_invitation(oob, qr_code_border)
+        self._schedule_refill(key)
+        return invitation
+
+    def _schedule_refill(self, key):
+        refill = self._refills.get(key)
+        if self.size > 0 and (refill is None or refill.done()):
+            self._refills[key] = asyncio.ensure_future(self._refill(key))
+
+    async def _refill(self, key):
+        (oob, qr_code_border) = key
+        while len(self._ready.setdefault(key, [])) < self.size:
+            try:
+                invitation = await self._create_invitation(oob, qr_code_border)
+            except Exception as e:
+                # The next pop will create one directly and surface the error
+                print(f"Could not pre-create an invitation for the pool: {e}")
+                return
+            # Make it available before notifying, so a pop during a slow listener (like a QR code upload) still gets it
+            self._ready[key].append((time.monotonic() + self.ttl, invitation))
+            for listener in self._ready_listeners:
+                try:
+                    await listener(*invitation)
+                except Exception as e:
+                    print(f"Invitation ready listener failed: {e}")
+
+    def cancel(self):
+        """stop any background refills and drop the ready invitations"""
+        for refill in self._refills.values():
+            if not refill.done():
+                refill.cancel()
+        self._refills = {}
+        self._ready = {}
+
+
+def aath_invitation_pool_size() -> int:
+    return config('AATH_INVITATION_POOL_SIZE', default=1, cast=int)
+
+
+def aath_invitation_pool_ttl() -> float:
+    return config('AATH_INVITATION_POOL_TTL', default=300.0, cast=float)
@@ -2,14 +2,15 @@
 Class for actual AATH issuer agent
 """
 
-from agent_factory.issuer_agent_interface import IssuerAgentInterface
+import asyncio
+from agent_factory.async_issuer_agent_interface import AsyncIssuerAgentInterface
 from agent_factory.aath.aath_agent_interface import AATHAgentInterface
+from agent_factory.aath.aath_credential_registry import aath_credential_registry
 import json
-from agent_test_utils import get_qr_code_from_invitation
-from agent_controller_client import agent_controller_GET, agent_controller_POST, expected_agent_state, setup_already_connected
+from agent_controller_client import agent_controller_GET_async, agent_controller_POST_async, run_on_agent_controller_loop, wait_for_agent_event_or_state_async
 from random import randint
 
-class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
+class AATHIssuerAgentInterface(AsyncIssuerAgentInterface, AATHAgentInterface):
 
     _my_public_did: str
     _schema: dict
@@ -21,21 +22,34 @@ class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
         self._schema = None
         self._credential_definition = None
         self._credential_json_dict = {}
+        self._credential_topic = "issue-credential"
         super().__init__(endpoint)
 
+    async def _reset_async(self):
+        self.reset_util()
+        self._schema = None
+        self._credential_definition = None
+        self._credential_json_dict = {}
+        self._credential_topic = "issue-credential"
+        self.__dict__.pop("credential_json", None)
+
+    def reset(self):
+        """forget the last feature's invitation and credentials, like a newly created interface. The public DID is kept"""
+        run_on_agent_controller_loop(self._reset_async)
+
     def get_issuer_type(self) -> str:
         """return the type of issuer as a string AATHIssuer"""
         return "AATHIssuer"
 
-    def create_invitation(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
-        return self.create_invitation_util(oob, print_qrcode, save_qrcode, qr_code_border)
+    async def create_invitation_async(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
+        return await self.create_invitation_util_async(oob, print_qrcode, save_qrcode, qr_code_border)
         
 
-    def connected(self):
-        return self.connected_util()
+    async def connected_async(self):
+        return await self.connected_util_async()
 
 
-    def send_credential(self, version=1, schema=None, credential_offer=None, revokable=False):
+    async def send_credential_async(self, version=1, schema=None, credential_offer=None, revokable=False):
         """send a credential to the holder"""
 
         if version == 2:
@@ -47,29 +61,30 @@ class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
 
         # How is the schema and cred def setup? Should be done here in the agent interface. Need to check if it exists first
         if self._my_public_did is None:
-            self._get_public_did()
+            await self._get_public_did()
         if schema is None:
             self._schema = self.DEFAULT_SCHEMA_TEMPLATE.copy()
         else:
             self._schema = schema
+        # Reuse a schema and credential definition this issuer already wrote to the ledger, in this or an earlier run.
+        if self._schema.get("schema_id") is None:
+            await self._use_registered_credential_definition(schema is None, revokable)
         # Check for an existing schema. If it doesn't exist create it.
         if self._schema.get("schema_id") is None:
-            self._create_schema(self._schema)
+            await self._create_schema(self._schema)
         # Check for an existing credential definition. If it doesn't exist create it.
-        if self._credential_definition is None or self._credential_definition.get("credential_definition_id") is None or self._credential_definition.get("schema_id") != self._schema.get("schema_id"):
-            if schema is None:
-                self._credential_definition = self.DEFAULT_CRED_DEF_TEMPLATE.copy()
-            else:
-                # self._credential_definition = {
-                #     "schema_id": self._schema["schema_id"],
-                #     "tag": str(randint(1, 10000)),
-                # }
-                self._credential_definition = {
-                    "schema_id": self._schema["schema_id"],
-                    "tag": self._schema["schema_name"],
-                }
-            self._create_credential_definition(
+        if self._credential_definition is None or self._credential_definition.get("credential_definition_id") is None or self._credential_definition.get("schema_id") != self._schema.get("schema_id") or bool(self._credential_definition.get("support_revocation")) != bool(revokable):
+            self._credential_definition = self._new_credential_definition(schema is None)
+            await self._create_credential_definition(
                 self._credential_definition, revokable)
+            aath_credential_registry.record(
+                self._my_public_did,
+                self._schema["schema_name"],
+                self._schema["schema_version"],
+                revokable,
+                self._schema["schema_id"],
+                self._credential_definition["credential_definition_id"],
+            )
 
         # if data is none, use a default cred
         # if data is not none then use it as the cred
@@ -87,7 +102,7 @@ class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
             "connection_id": self.invitation_json['connection_id'],
         }
 
-        (resp_status, resp_text) = agent_controller_POST(
+        (resp_status, resp_text) = await agent_controller_POST_async(
             self.endpoint + "/agent/command/",
             topic,
             operation="send-offer",
@@ -98,20 +113,48 @@ class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
                 f"Call to send credential failed: {resp_status}; {resp_text}"
             )
         else:
+            self._credential_topic = topic
             self.credential_json = json.loads(resp_text)
             # also add it to the credential json dict just in case we the tests are using multiple credentials
             self._credential_json_dict[self._credential_definition["tag"]] = self.credential_json
 
 
-    def revoke_credential(self, publish_immediately=True, notify_holder=False, credential=None):
+    async def credential_issued_async(self, thread_id=None, wait_time=20.0):
+        """return True once the credential for the thread, default the last one sent, has been issued to the holder"""
+        if thread_id is None:
+            thread_id = self.credential_json["thread_id"]
+        issued_states = ["credential-issued", "done", "credential_issued", "credential_acked"]
+        result = await wait_for_agent_event_or_state_async(
+            self._webhook_agent_id,
+            ["issue_credential", "issue_credential_v2_0"],
+            lambda payload: payload.get("thread_id") == thread_id and payload.get("state") in issued_states,
+            self.endpoint + "/agent/command/",
+            self._credential_topic,
+            lambda resp_json: resp_json.get("state") in issued_states,
+            id=thread_id,
+            timeout=wait_time,
+        )
+        if not result:
+            state = result.resp_json.get("state") if result.resp_json else "None"
+            print("From", self.endpoint, "Expected credential state", issued_states, "but received", state, ", with a response status of", result.resp_status)
+        return result.matched
+
+    def credential_issued(self, thread_id=None, wait_time=20.0):
+        return run_on_agent_controller_loop(self.credential_issued_async, thread_id, wait_time)
+
+    async def revoke_credential_async(self, publish_immediately=True, notify_holder=False, credential=None):
         """revoke a credential"""
         topic = "revocation"
 
         if credential:
             # get the cred_rev_id and rev_reg_id from the credential given the credential name
-            cred_rev_id, rev_reg_id = self._get_revocation_ids(self._credential_json_dict[credential]["thread_id"]);
+            thread_id = self._credential_json_dict[credential]["thread_id"]
         else:
-            cred_rev_id, rev_reg_id = self._get_revocation_ids(self.credential_json["thread_id"]);
+            thread_id = self.credential_json["thread_id"]
+        # The revocation ids only exist once the credential has been issued
+        if not await self.credential_issued_async(thread_id):
+            raise Exception(f"Credential for thread {thread_id} was not issued, cannot revoke it")
+        cred_rev_id, rev_reg_id = await self._get_revocation_ids(thread_id)
 
         credential_revocation = {
             "cred_rev_id": cred_rev_id,
@@ -123,7 +166,7 @@ class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
         if notify_holder:
             credential_revocation["notify_connection_id"] = self.invitation_json['connection_id']
 
-        (resp_status, resp_text) = agent_controller_POST(
+        (resp_status, resp_text) = await agent_controller_POST_async(
             self.endpoint + "/agent/command/",
             topic,
             operation="revoke",
@@ -136,8 +179,99 @@ class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
         else:
             self.credential_json = json.loads(resp_text)
 
-    def _get_public_did(self):
-        (resp_status, resp_text) = agent_controller_GET(
+    def _new_credential_definition(self, default_schema):
+        if default_schema:
+            return self.DEFAULT_CRED_DEF_TEMPLATE.copy()
+        # return {
+        #     "schema_id": self._schema["schema_id"],
+        #     "tag": str(randint(1, 10000)),
+        # }
+        return {
+            "schema_id": self._schema.get("schema_id"),
+            "tag": self._schema["schema_name"],
+        }
+
+    async def _lookup_registered_ids(self, schema, revokable) -> dict:
+        """return the registered schema and cred def ids for this issuer if the agent can still resolve them"""
+        registered = aath_credential_registry.lookup(
+            self._my_public_did, schema["schema_name"], schema["schema_version"], revokable
+        )
+        if registered is None:
+            return None
+
+        ((schema_resp_status, _), (cred_def_resp_status, _)) = await asyncio.gather(
+            agent_controller_GET_async(self.endpoint + "/agent/command/", "schema", id=registered["schema_id"]),
+            agent_controller_GET_async(self.endpoint + "/agent/command/", "credential-definition", id=registered["credential_definition_id"]),
+        )
+        if schema_resp_status != 200 or cred_def_resp_status != 200:
+            # Stale entry, eg the ledger was reset. Drop it so it gets recreated.
+            aath_credential_registry.remove(
+                self._my_public_did, schema["schema_name"], schema["schema_version"], revokable
+            )
+            return None
+        return registered
+
+    async def _use_registered_credential_definition(self, default_schema, revokable):
+        """use the registered schema and cred def for this issuer if there is one"""
+        registered = await self._lookup_registered_ids(self._schema, revokable)
+        if registered is None:
+            return
+
+        self._schema["schema_id"] = registered["schema_id"]
+        self._credential_definition = self._new_credential_definition(default_schema)
+        self._credential_definition["schema_id"] = registered["schema_id"]
+        self._credential_definition["credential_definition_id"] = registered["credential_definition_id"]
+        if revokable:
+            self._credential_definition["support_revocation"] = True
+
+    def provision_credential_definitions(self, schemas_and_revocation):
+        return run_on_agent_controller_loop(self.provision_credential_definitions_async, schemas_and_revocation)
+
+    async def provision_credential_definitions_async(self, schemas_and_revocation) -> list:
+        """
+        Make sure a schema and cred def exist, and are registered, for every (schema, revokable) pair given
+        so later send_credential calls only have to send the offer. Different schemas are created
+        concurrently; each schema is written once and its cred defs are then created together.
+        """
+        if self._my_public_did is None:
+            await self._get_public_did()
+
+        revocation_by_schema = {}
+        schemas = {}
+        for (schema, revokable) in schemas_and_revocation:
+            schema_key = (schema["schema_name"], schema["schema_version"])
+            schemas[schema_key] = schema
+            revocation_by_schema.setdefault(schema_key, set()).add(bool(revokable))
+
+        async def provision_schema(schema, revocation_options):
+            registered = await asyncio.gather(*[self._lookup_registered_ids(schema, revokable) for revokable in revocation_options])
+            missing = [revokable for (revokable, ids) in zip(revocation_options, registered) if ids is None]
+            if not missing:
+                return registered
+            schema_id = next((ids["schema_id"] for ids in registered if ids is not None), None)
+            if schema_id is None:
+                schema_id = await self._post_schema({k: v for (k, v) in schema.items() if k != "schema_id"})
+
+            async def provision_cred_def(revokable):
+                cred_def = {"schema_id": schema_id, "tag": schema["schema_name"]}
+                if revokable:
+                    cred_def["support_revocation"] = True
+                cred_def_id = await self._post_credential_definition(cred_def)
+                aath_credential_registry.record(
+                    self._my_public_did, schema["schema_name"], schema["schema_version"], revokable, schema_id, cred_def_id
+                )
+                return {"schema_id": schema_id, "credential_definition_id": cred_def_id}
+
+            return registered + await asyncio.gather(*[provision_cred_def(revokable) for revokable in missing])
+
+        results = await asyncio.gather(*[
+            provision_schema(schemas[schema_key], sorted(revocation_options))
+            for (schema_key, revocation_options) in revocation_by_schema.items()
+        ])
+        return [ids for schema_results in results for ids in schema_results if ids is not None]
+
+    async def _get_public_did(self):
+        (resp_status, resp_text) = await agent_controller_GET_async(
             self.endpoint + "/agent/command/", "did"
         )
         if resp_status != 200:
@@ -148,8 +282,8 @@ class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
             resp_json = json.loads(resp_text)
             self._my_public_did = resp_json["did"]
 
-    def _create_schema(self, schema):
-        (resp_status, resp_text) = agent_controller_POST(
+    async def _post_schema(self, schema) -> str:
+        (resp_status, resp_text) = await agent_controller_POST_async(
             self.endpoint + "/agent/command/", "schema", data=schema
         )
         if resp_status != 200:
@@ -158,15 +292,13 @@ class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
             )
         else:
             resp_json = json.loads(resp_text)
-            self._schema["schema_id"] = resp_json["schema_id"]
+            return resp_json["schema_id"]
 
-    def _create_credential_definition(self, cred_def, revokable):
-        cred_def["schema_id"] = self._schema["schema_id"]
+    async def _create_schema(self, schema):
+        self._schema["schema_id"] = await self._post_schema(schema)
 
-        if revokable:
-            cred_def["support_revocation"] = True
-
-        (resp_status, resp_text) = agent_controller_POST(
+    async def _post_credential_definition(self, cred_def) -> str:
+        (resp_status, resp_text) = await agent_controller_POST_async(
             self.endpoint + "/agent/command/", "credential-definition", data=cred_def
         )
         if resp_status != 200:
@@ -175,11 +307,19 @@ class AATHIssuerAgentInterface(IssuerAgentInterface, AATHAgentInterface):
             )
         else:
             resp_json = json.loads(resp_text)
-            self._credential_definition["credential_definition_id"] = resp_json["credential_definition_id"]
+            return resp_json["credential_definition_id"]
+
+    async def _create_credential_definition(self, cred_def, revokable):
+        cred_def["schema_id"] = self._schema["schema_id"]
+
+        if revokable:
+            cred_def["support_revocation"] = True
+
+        self._credential_definition["credential_definition_id"] = await self._post_credential_definition(cred_def)
 
-    def _get_revocation_ids(self, thread_id):
+    async def _get_revocation_ids(self, thread_id):
 
-        (resp_status, resp_text) = agent_controller_GET(
+        (resp_status, resp_text) = await agent_controller_GET_async(
             self.endpoint + "/agent/response/",
             "revocation-registry",
             id=thread_id,
@@ -2,26 +2,35 @@
 Absctact Base Class for actual issuer agent interfaces to implement
 """
 
-from agent_factory.verifier_agent_interface import VerifierAgentInterface
+from agent_factory.async_verifier_agent_interface import AsyncVerifierAgentInterface
 from agent_factory.aath.aath_agent_interface import AATHAgentInterface
 import json
 from agent_test_utils import get_qr_code_from_invitation
-from agent_controller_client import agent_controller_GET, agent_controller_POST, expected_agent_state, setup_already_connected, expected_agent_proof_state
+from agent_controller_client import agent_controller_POST_async, run_on_agent_controller_loop, wait_for_agent_event_or_state_async
 
 
-class AATHVerifierAgentInterface(VerifierAgentInterface, AATHAgentInterface):
+class AATHVerifierAgentInterface(AsyncVerifierAgentInterface, AATHAgentInterface):
 
     def get_issuer_type(self) -> str:
         """return the type of issuer as a string AATHVerifier"""
         return "AATHVerifier"
 
-    def create_invitation(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
-        return self.create_invitation_util(oob, print_qrcode, save_qrcode, qr_code_border)
+    async def _reset_async(self):
+        self.reset_util()
+        for attribute in ("create_request_json", "proof_request_json"):
+            self.__dict__.pop(attribute, None)
 
-    def connected(self):
-        return self.connected_util()
+    def reset(self):
+        """forget the last feature's invitation and proof requests, like a newly created interface"""
+        run_on_agent_controller_loop(self._reset_async)
 
-    def send_proof_request(self, version=1, request_for_proof=None, connectionless=False):
+    async def create_invitation_async(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
+        return await self.create_invitation_util_async(oob, print_qrcode, save_qrcode, qr_code_border)
+
+    async def connected_async(self):
+        return await self.connected_util_async()
+
+    async def send_proof_request_async(self, version=1, request_for_proof=None, connectionless=False):
         """create a proof request """
         
         if connectionless == True:
@@ -49,7 +58,7 @@ class AATHVerifierAgentInterface(VerifierAgentInterface, AATHAgentInterface):
         if connectionless:
             # connectionless proof requests need to call the proof/create-request endpoint first. Then get the id out of it and add it to the data
             # for the out-of-band/create-invitation endpoint.
-            (resp_status, resp_text) = agent_controller_POST(
+            (resp_status, resp_text) = await agent_controller_POST_async(
                 self.endpoint + "/agent/command/",
                 "proof",
                 operation="create-request",
@@ -70,7 +79,7 @@ class AATHVerifierAgentInterface(VerifierAgentInterface, AATHAgentInterface):
             presentation_request["connection_id"] = self.invitation_json['connection_id']
             operation = "send-request"
 
-        (resp_status, resp_text) = agent_controller_POST(
+        (resp_status, resp_text) = await agent_controller_POST_async(
             self.endpoint + "/agent/command/",
             topic,
             operation=operation,
@@ -83,15 +92,23 @@ class AATHVerifierAgentInterface(VerifierAgentInterface, AATHAgentInterface):
         else:
             self.proof_request_json = json.loads(resp_text)
             if connectionless:
-                qrcode = get_qr_code_from_invitation(self.proof_request_json, print_qr_code=False, save_qr_code=True)
+                qrcode = get_qr_code_from_invitation(self.proof_request_json)
                 return qrcode
 
-    def proof_request_verified(self):
+    async def proof_request_verified_async(self, wait_time=10.0):
         """return true if proof request verified"""
         thread_id = self.create_request_json["record"]["thread_id"]
-        return expected_agent_proof_state(
-            self.endpoint,
-            thread_id=thread_id,
-            status_txt=["true"],
-            wait_time=10.0,
-        )
\ No newline at end of file
+        result = await wait_for_agent_event_or_state_async(
+            self._webhook_agent_id,
+            ["present_proof", "present_proof_v2_0"],
+            lambda payload: payload.get("thread_id") == thread_id and payload.get("verified") in ["true", True],
+            self.endpoint + "/agent/command/",
+            "proof",
+            lambda resp_json: resp_json.get("verified") in ["true"],
+            id=thread_id,
+            timeout=wait_time,
+        )
+        if not result:
+            verified = result.resp_json.get("verified", "False") if result.resp_json else "False"
+            print("From", self.endpoint, "Expected state ['true'] but received", verified, ", with a response status of", result.resp_status)
+        return result.matched
@@ -0,0 +1,29 @@
+"""
+Mixin for the issuer and verifier interface base classes with the hooks run scoped agent interfaces use
+to keep an interface from one feature to the next.
+"""
+
+from browser_pool import browser_pool
+
+
+class AgentInterfaceLifecycle():
+
+    def health_check(self) -> bool:
+        """return False if the interface can no longer be used and has to be created again"""
+        driver = getattr(self, 'driver', None)
+        if driver is None:
+            return True
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def reset(self):
+        """get ready for the next feature, agent interfaces are kept for the whole run"""
+
+    def close(self):
+        """release what the interface holds, like giving its browser back to the browser pool"""
+        driver = getattr(self, 'driver', None)
+        if driver is not None:
+            browser_pool.release(driver)
@@ -0,0 +1,41 @@
+"""
+Absctact Base Class for issuer agent interfaces that implement their calls as coroutines.
+The blocking IssuerAgentInterface methods are shims that run the coroutines on the shared
+agent controller loop, so behave steps keep calling them as before while independent agent
+calls inside an interface can be run together with asyncio.gather.
+"""
+
+from abc import abstractmethod
+from agent_factory.issuer_agent_interface import IssuerAgentInterface
+from agent_controller_client import run_on_agent_controller_loop
+
+
+class AsyncIssuerAgentInterface(IssuerAgentInterface):
+
+    @abstractmethod
+    async def create_invitation_async(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
+        """create an invitation and return the json back to the caller """
+
+    @abstractmethod
+    async def connected_async(self) -> bool:
+        """return True/False indicating if this issuer is connected to the wallet holder """
+
+    @abstractmethod
+    async def send_credential_async(self, version=1, schema=None, credential_offer=None, revokable=False):
+        """send a credential to the holder"""
+
+    @abstractmethod
+    async def revoke_credential_async(self, publish_immediately=True, notify_holder=False, credential=None):
+        """revoke a credential"""
+
+    def create_invitation(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
+        return run_on_agent_controller_loop(self.create_invitation_async, oob, print_qrcode, save_qrcode, qr_code_border)
+
+    def connected(self) -> bool:
+        return run_on_agent_controller_loop(self.connected_async)
+
+    def send_credential(self, version=1, schema=None, credential_offer=None, revokable=False):
+        return run_on_agent_controller_loop(self.send_credential_async, version, schema, credential_offer, revokable)
+
+    def revoke_credential(self, publish_immediately=True, notify_holder=False, credential=None):
+        return run_on_agent_controller_loop(self.revoke_credential_async, publish_immediately, notify_holder, credential)
@@ -0,0 +1,40 @@
+"""
+Absctact Base Class for verifier agent interfaces that implement their calls as coroutines.
+The blocking VerifierAgentInterface methods are shims that run the coroutines on the shared
+agent controller loop, so behave steps keep calling them as before.
+"""
+
+from abc import abstractmethod
+from agent_factory.verifier_agent_interface import VerifierAgentInterface
+from agent_controller_client import run_on_agent_controller_loop
+
+
+class AsyncVerifierAgentInterface(VerifierAgentInterface):
+
+    @abstractmethod
+    async def create_invitation_async(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
+        """create an invitation and return the json back to the caller """
+
+    @abstractmethod
+    async def connected_async(self) -> bool:
+        """return True/False indicating if this verifier is connected to the wallet holder """
+
+    @abstractmethod
+    async def send_proof_request_async(self, version=1, request_for_proof=None, connectionless=False):
+        """do a proof request"""
+
+    @abstractmethod
+    async def proof_request_verified_async(self) -> bool:
+        """return true if proof request verified"""
+
+    def create_invitation(self, oob=False, print_qrcode=False, save_qrcode=False, qr_code_border=40):
+        return run_on_agent_controller_loop(self.create_invitation_async, oob, print_qrcode, save_qrcode, qr_code_border)
+
+    def connected(self) -> bool:
+        return run_on_agent_controller_loop(self.connected_async)
+
+    def send_proof_request(self, version=1, request_for_proof=None, connectionless=False):
+        return run_on_agent_controller_loop(self.send_proof_request_async, version, request_for_proof, connectionless)
+
+    def proof_request_verified(self) -> bool:
+        return run_on_agent_controller_loop(self.proof_request_verified_async)
@@ -57,5 +57,5 @@ class AATHAgentInterface():
                 self.invitation_json["connection_id"] = connection_id
         else:
             connection_id = self.invitation_json['connection_id']
-        return expected_agent_state(self.endpoint, "connection", connection_id, "complete", sleep_time=2.0)
+        return expected_agent_state(self.endpoint, "connection", connection_id, "complete", wait_time=10.0, sleep_time=2.0)
 
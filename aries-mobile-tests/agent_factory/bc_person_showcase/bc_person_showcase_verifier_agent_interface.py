@@ -2,11 +2,10 @@
 Absctact Base Class for actual verifier agent interfaces to implement
 """
 
-from asyncio import sleep
 from agent_factory.verifier_agent_interface import VerifierAgentInterface
 import json
 from agent_test_utils import get_qr_code_from_invitation
-from agent_controller_client import agent_controller_GET, agent_controller_POST, expected_agent_state, setup_already_connected
+from agent_controller_client import agent_controller_GET, agent_controller_POST, expected_agent_state, setup_already_connected, wait_for_agent_state
 
 
 class BCPersonShowcaseVerifierAgentInterface(VerifierAgentInterface):
@@ -93,27 +92,29 @@ class BCPersonShowcaseVerifierAgentInterface(VerifierAgentInterface):
         else:
             connection_id = self.invitation_json['connection']['id']
         
-        return self._expected_connection_state(self.endpoint, "/connections", connection_id, "complete", 6, 2)
+        return self._expected_connection_state(self.endpoint, "/connections", connection_id, "complete", wait_time=12.0, sleep_time=2.0)
 
 
     def _expected_connection_state(self, agent_url, protocol_txt, id, status_txt, wait_time=2.0, sleep_time=0.5):
-        sleep(sleep_time)
-        state = "None"
+        """wait up to wait_time seconds for the connection to reach one of the given states"""
         if type(status_txt) != list:
             status_txt = [status_txt]
         # "N/A" means that the controller can't determine the state - we'll treat this as a successful response
-        status_txt.append("N/A")
-        #for i in range(int(wait_time/sleep_time)):
-        for i in range(int(wait_time)):
-            (resp_status, resp_text) = agent_controller_GET(agent_url, protocol_txt, id=id)
-            if resp_status == 200:
-                resp_json = json.loads(resp_text)
-                state = resp_json["state"]
-                if state in status_txt:
-                    return True
-            sleep(sleep_time)
+        status_txt = status_txt + ["N/A"]
+
+        result = wait_for_agent_state(
+            agent_url,
+            protocol_txt,
+            lambda resp_json: resp_json.get("state") in status_txt,
+            id=id,
+            timeout=wait_time,
+            max_interval=sleep_time,
+        )
+        if result:
+            return True
 
-        print("From", agent_url, "Expected state", status_txt, "but received", state, ", with a response status of", resp_status)
+        state = result.resp_json.get("state") if result.resp_json else "None"
+        print("From", agent_url, "Expected state", status_txt, "but received", state, ", with a response status of", result.resp_status)
         return False
 
     def send_proof_request(self, version=1, request_for_proof=None, connectionless=False):
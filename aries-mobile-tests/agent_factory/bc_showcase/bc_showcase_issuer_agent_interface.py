@@ -3,15 +3,9 @@ Class for BC Showcase issuer agent for Student and Lawer Showcase Credentials
 """
 import base64
 import io
-import time
 from agent_factory.issuer_agent_interface import IssuerAgentInterface
 from agent_test_utils import add_border_to_qr_code
-from sys import platform
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
+from browser_pool import browser_pool
 # import Page Objects needed
 from agent_factory.bc_showcase.pageobjects.bc_wallet_showcase_main_page import BCWalletShowcaseMainPage
 from agent_factory.bc_showcase.pageobjects.who_do_you_want_to_be_page import WhoDoYouWantToBePage
@@ -43,17 +37,8 @@ class BCShowcaseIssuerAgentInterface(IssuerAgentInterface):
     def __init__(self, endpoint):
         # Standup Selenuim Driver with endpoint
         super().__init__(endpoint)
-        if platform == "linux" or platform == "linux2":
-            print("Starting Chromium on linux for BC Showcase Issuer Agent")
-            options = Options()
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--headless")
-            options.add_argument("--enable-javascript")
-            self.driver = webdriver.Chrome(options=options, service=Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()))
-        else:
-            print("Starting Chrome on Mac or Windows for Issuer Agent")
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+        # The showcase draws its QR codes on a canvas, so its pictures don't need to load
+        self.driver = browser_pool.lease(blocked_resource_types=("image",))
         # go to the issuer endpoint in the browser
         self.driver.get(self.endpoint)
         # instantiate intial page objects
@@ -63,6 +48,14 @@ class BCShowcaseIssuerAgentInterface(IssuerAgentInterface):
         if not self._bc_wallet_showcase_main_page.on_this_page():
             raise Exception('Something is wrong, not on the BC Wallet Showcase Main Page')
 
+    def reset(self):
+        """start the next feature from the Showcase main page, forgetting the progress the Showcase keeps in the browser"""
+        self.driver.delete_all_cookies()
+        self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        self.driver.get(self.endpoint)
+        if not self._bc_wallet_showcase_main_page.on_this_page():
+            raise Exception('Something is wrong, not on the BC Wallet Showcase Main Page')
+
     def get_issuer_type(self) -> str:
         """return the type of issuer as a string BCShowcaseIssuer"""
         return "BCShowcaseIssuer"
@@ -83,8 +76,8 @@ class BCShowcaseIssuerAgentInterface(IssuerAgentInterface):
         self._who_do_you_want_to_be_page = self._bc_wallet_showcase_main_page.select_get_started()
         #self.driver.minimize_window()
         self.driver.maximize_window()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._who_do_you_want_to_be_page.wait_for_page_loaded()
         self.driver.save_screenshot('who_do_you_want_to_be_page.png')
         if actor == "Student":
             self._who_do_you_want_to_be_page.select_student()
@@ -94,22 +87,22 @@ class BCShowcaseIssuerAgentInterface(IssuerAgentInterface):
             raise Exception(f"Unknown actor type {actor}")
         #self.driver.minimize_window()
         self.driver.maximize_window()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._who_do_you_want_to_be_page.wait_for_page_loaded()
         self.driver.save_screenshot('who_do_you_want_to_be_page_actor_select.png')
         self._lets_get_started_page = self._who_do_you_want_to_be_page.select_next()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._lets_get_started_page.wait_for_page_loaded()
         self.driver.save_screenshot('lets_get_started_page.png')
         self._install_bc_wallet_page = self._lets_get_started_page.select_next()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._install_bc_wallet_page.wait_for_page_loaded()
         self.driver.save_screenshot('install_bc_wallet_page.png')
         self._connect_with_best_bc_college_page = self._install_bc_wallet_page.select_skip()
         #self.driver.minimize_window()
         self.driver.maximize_window()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._connect_with_best_bc_college_page.wait_for_page_loaded()
         self.driver.save_screenshot('connect_with_best_bc_college_page.png')
         qrcode = self._connect_with_best_bc_college_page.get_qr_code()
         return add_border_to_qr_code(qrcode, border_size=80)
@@ -2,16 +2,9 @@
 Class for BC Showcase verifier agent for Student and Lawer Showcase Proofs
 """
 
-from asyncio import sleep
-import time
 from agent_factory.verifier_agent_interface import VerifierAgentInterface
 from agent_test_utils import add_border_to_qr_code
-from sys import platform
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
+from browser_pool import browser_pool
 import json
 from agent_test_utils import get_qr_code_from_invitation
 from agent_controller_client import agent_controller_GET, agent_controller_POST, expected_agent_state, setup_already_connected
@@ -51,17 +44,8 @@ class BCShowcaseVerifierAgentInterface(VerifierAgentInterface):
     def __init__(self, endpoint):
         # Standup Selenuim Driver with endpoint
         super().__init__(endpoint)
-        if platform == "linux" or platform == "linux2":
-            print("Starting Chromium on linux for BC Showcase Issuer Agent")
-            options = Options()
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--headless")
-            options.add_argument("--enable-javascript")
-            self.driver = webdriver.Chrome(options=options, service=Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()))
-        else:
-            print("Starting Chrome on Mac or Windows for Issuer Agent")
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+        # The showcase draws its QR codes on a canvas, so its pictures don't need to load
+        self.driver = browser_pool.lease(blocked_resource_types=("image",))
         # go to the issuer endpoint in the browser
         self.driver.get(self.endpoint)
         # instantiate intial page objects and navigate to the Proof portion of the BC Wallet Showcase
@@ -72,6 +56,14 @@ class BCShowcaseVerifierAgentInterface(VerifierAgentInterface):
             raise Exception('Something is wrong, not on the BC Wallet Showcase Main Page')
 
 
+    def reset(self):
+        """start the next feature from the Showcase main page, forgetting the progress the Showcase keeps in the browser"""
+        self.driver.delete_all_cookies()
+        self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        self.driver.get(self.endpoint)
+        if not self._bc_wallet_showcase_main_page.on_this_page():
+            raise Exception('Something is wrong, not on the BC Wallet Showcase Main Page')
+
     def get_issuer_type(self) -> str:
         """return the type of issuer as a string BCShowcaseVerifier"""
         return "BCShowcaseVerifier"
@@ -90,8 +82,8 @@ class BCShowcaseVerifierAgentInterface(VerifierAgentInterface):
     def send_proof_request(self, actor:str, proof:str, version=1, request_for_proof=None, connectionless=False):
         """create a proof request """
         self._who_do_you_want_to_be_page = self._bc_wallet_showcase_main_page.select_get_started()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._who_do_you_want_to_be_page.wait_for_page_loaded()
         self.driver.save_screenshot('Verifier_who_do_you_want_to_be_page.png')
         #self.driver.minimize_window()
         self.driver.maximize_window()
@@ -104,52 +96,52 @@ class BCShowcaseVerifierAgentInterface(VerifierAgentInterface):
         #self.driver.minimize_window()
         self.driver.maximize_window()
         self._lets_get_started_page = self._who_do_you_want_to_be_page.select_next()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._lets_get_started_page.wait_for_page_loaded()
         self.driver.save_screenshot('Verifier_lets_get_started_page.png')
         self._install_bc_wallet_page = self._lets_get_started_page.select_next()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._install_bc_wallet_page.wait_for_page_loaded()
         self.driver.save_screenshot('Verifier_install_bc_wallet_page.png')
         self._connect_with_best_bc_college_page = self._install_bc_wallet_page.select_skip()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._connect_with_best_bc_college_page.wait_for_page_loaded()
         self.driver.save_screenshot('Verifier_connect_with_best_bc_college_page.png')
         #self.driver.minimize_window()
         self.driver.maximize_window()
         self._youre_all_set_page = self._connect_with_best_bc_college_page.select_i_already_have_my_credential()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._youre_all_set_page.wait_for_page_loaded()
         self.driver.save_screenshot('Verifier_youre_all_set_page.png')
         self._using_your_credentials_page = self._youre_all_set_page.select_finish()
-        #pause 3 second to let page loads
-        time.sleep(3)
+        # wait for the page to load instead of a fixed pause
+        self._using_your_credentials_page.wait_for_page_loaded()
         self.driver.save_screenshot('Verifier_using_your_credentials_page.png')
 
         if proof == "Cool Clothes Online":
             self._getting_a_student_discount_page = self._using_your_credentials_page.select_cool_clothes_online_start()
-            #pause 3 second to let page loads
-            time.sleep(3)
+            # wait for the page to load instead of a fixed pause
+            self._getting_a_student_discount_page.wait_for_page_loaded()
             self.driver.save_screenshot('Verifier_getting_a_student_discount_page.png')
             #self.driver.minimize_window()
             self.driver.maximize_window()
             self._start_proving_youre_a_student_page = self._getting_a_student_discount_page.select_start()
-            #pause 3 second to let page loads
-            time.sleep(3)
+            # wait for the page to load instead of a fixed pause
+            self._start_proving_youre_a_student_page.wait_for_page_loaded()
             self.driver.save_screenshot('Verifier_start_proving_youre_a_student_page.png')
             #self.driver.minimize_window()
             self.driver.maximize_window()
             qrcode = self._start_proving_youre_a_student_page.get_qr_code()
         elif proof == "BestBC College":
             self._book_a_study_room_page = self._using_your_credentials_page.select_bestbc_college_start()
-            #pause 3 second to let page loads
-            time.sleep(3)
+            # wait for the page to load instead of a fixed pause
+            self._book_a_study_room_page.wait_for_page_loaded()
             self.driver.save_screenshot('Verifier_book_a_study_room_page.png')
             #self.driver.minimize_window()
             self.driver.maximize_window()
             self._start_booking_the_room_page = self._book_a_study_room_page.select_start()
-            #pause 3 second to let page loads
-            time.sleep(3)
+            # wait for the page to load instead of a fixed pause
+            self._start_booking_the_room_page.wait_for_page_loaded()
             self.driver.save_screenshot('Verifier_start_booking_the_room_page.png')
             #self.driver.minimize_window()
             self.driver.maximize_window()
@@ -21,9 +21,14 @@ class StartProvingYoureAStudentPage(WebBasePage):
     def on_this_page(self):     
         return super().on_this_page(self.on_this_page_text_locator) 
 
+    def wait_for_page_loaded(self, timeout=10):
+        # The page is ready the moment its QR code is drawn, whatever else is still loading
+        self.wait_for_qr_code(self.qr_code_locator, timeout)
+        return True
+
     def get_qr_code(self):
         try:
-            qr_code = self.find_by(self.qr_code_locator, wait_condition=WaitCondition.VISIBILITY_OF_ELEMENT_LOCATED)
+            qr_code = self.wait_for_qr_code(self.qr_code_locator)
         except Exception as e:
             if not self.on_this_page():
                 raise Exception(f"App not on the {type(self)} page")
@@ -1,15 +1,9 @@
 """
 Class for actual IDIM Verified Person Credetial issuer agent
 """
-from time import sleep
 from agent_factory.issuer_agent_interface import IssuerAgentInterface
-from sys import platform
+from browser_pool import browser_pool
 from decouple import config
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
 # import Page Objects needed
 from pageobjects.bc_wallet.issuer_get_authcode_interface.bc_vp_issuer_get_authcode_interface_gapi import BCVPIssuerGetAuthCodeInterface
 from agent_factory.bc_vp.pageobjects.authenticate_with_page import AuthenticateWithPage
@@ -17,6 +11,7 @@ from agent_factory.bc_vp.pageobjects.authenticate_page import AuthenticatePage
 from agent_factory.bc_vp.pageobjects.authcode_page import AuthCodePage
 from agent_factory.bc_vp.pageobjects.invites_page import InvitesPage
 from agent_factory.bc_vp.pageobjects.invite_page import InvitePage
+from agent_factory.bc_vp.bc_vp_session_store import bc_vp_session_store
 from enum import Enum
 from enum import auto
 
@@ -46,17 +41,16 @@ class BC_VP_IssuerAgentInterface(IssuerAgentInterface):
     def __init__(self, endpoint):
         # Standup Selenuim Driver with endpoint
         super().__init__(endpoint)
-        if platform == "linux" or platform == "linux2":
-            print("Starting Chromium on linux for Issuer Agent")
-            options = Options()
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--headless")
-            self.driver = webdriver.Chrome(options=options, service=Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()))
-        else:
-            print("Starting Chrome on Mac or Windows for Issuer Agent")
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()))
+        self.driver = browser_pool.lease()
+        # carry on with the saved session when it is still signed in, and only log in when it is not
+        self._invites_page = InvitesPage(self.driver)
+        try:
+            if bc_vp_session_store.restore(self.driver, self.endpoint) and self._invites_page.wait_for_signed_in():
+                print("Restored the saved session for the BC VP Issuer")
+                return
+        except Exception as e:
+            print(f"Could not restore the saved session for the BC VP Issuer: {e}")
+        self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
         # go to the issuer endpoint in the browser
         self.driver.get(self.endpoint)
         # instantiate intial page objects
@@ -70,6 +64,7 @@ class BC_VP_IssuerAgentInterface(IssuerAgentInterface):
         username = config('BC_VP_USERNAME')
         password = config('BC_VP_PASSWORD')
         self._login(username, password)
+        bc_vp_session_store.save(self.driver)
 
     def get_issuer_type(self) -> str:
         """return the type of issuer as a string BCVPIssuer"""
@@ -96,7 +91,7 @@ class BC_VP_IssuerAgentInterface(IssuerAgentInterface):
             # Set the credential issued flag to off and save the page
             # This is a temporary fix until search is fixed in the Issuer page
             self._invites_page.search(self.DEFAULT_CREDENTIAL_DATA["email"])
-            sleep(5)
+            self._invites_page.wait_for_search_results(self.DEFAULT_CREDENTIAL_DATA["email"])
             self._invites_page.select_edit_invite(1)
             self._invites_page.uncheck_issued()
             self._invites_page.save_invite()
@@ -137,7 +132,7 @@ class BC_VP_IssuerAgentInterface(IssuerAgentInterface):
     def _get_invitation_url(self):
         # Get the invitation url from the invites page
         self._invites_page.search(self.DEFAULT_CREDENTIAL_DATA["email"])
-        sleep(5)
+        self._invites_page.wait_for_search_results(self.DEFAULT_CREDENTIAL_DATA["email"])
         self._invites_page.select_edit_invite(1)
         return self._invites_page.get_invitation_url()
     
@@ -152,6 +147,10 @@ class BC_VP_IssuerAgentInterface(IssuerAgentInterface):
             raise Exception(
                 'Something is wrong, on the Invites Page for the BC VP Issuer')
 
+    def reset(self):
+        """start the next feature from the first page, keeping the browser"""
+        self.restart_issue_credential()
+
     def revoke_credential(self, publish_immediately=True, notify_holder=False):
         """revoke a credential"""
         return Exception('Function not supported for BC VP Issuer')
@@ -0,0 +1,101 @@
+"""
+Encrypted on disk copy of the BC VP Issuer admin session, the cookies of every site involved in the login and
+the web storage of the issuer app, so the interface can carry on with the last session instead of logging in,
+and going through GitHub and the emailed auth code, every time it is created.
+The file is encrypted with a key derived from BC_VP_SESSION_KEY, or the BC VP password when that is not set,
+and is only used while it is younger than BC_VP_SESSION_MAX_AGE hours.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+from cryptography.fernet import Fernet, InvalidToken
+from decouple import config
+
+# Cookie fields Network.setCookies takes back from what Network.getAllCookies gives
+COOKIE_PARAMS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires", "priority")
+
+
+class BCVPSessionStore():
+
+    _session_file_path: str
+
+    def __init__(self, session_file_path: str, secret: str, max_age: float):
+        self._session_file_path = session_file_path
+        self._secret = secret
+        self._max_age = max_age
+        self._lock = threading.Lock()
+
+    def _fernet(self, salt: bytes) -> Fernet:
+        key = hashlib.pbkdf2_hmac("sha256", self._secret.encode(), salt, 200000)
+        return Fernet(base64.urlsafe_b64encode(key))
+
+    def _load(self) -> dict:
+        """return the saved session, or None when there is none, it is too old or it can't be decrypted"""
+        try:
+            with open(self._session_file_path, "rb") as session_file:
+                salt = session_file.read(16)
+                token = session_file.read()
+            return json.loads(self._fernet(salt).decrypt(token, ttl=int(self._max_age * 3600)))
+        except FileNotFoundError:
+            return None
+        except (InvalidToken, ValueError) as e:
+            print(f"Not using the saved BC VP Issuer session, it is expired or can't be read: {type(e).__name__}")
+            return None
+
+    def save(self, driver):
+        """save the session of the browser, which has to be on the issuer app"""
+        if not self._secret:
+            return
+        cookies = [
+            {name: value for (name, value) in cookie.items() if name in COOKIE_PARAMS and not (name == "expires" and cookie.get("session"))}
+            for cookie in driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        ]
+        session = {
+            "cookies": cookies,
+            "local_storage": driver.execute_script("return Object.assign({}, window.localStorage);"),
+            "session_storage": driver.execute_script("return Object.assign({}, window.sessionStorage);"),
+        }
+        salt = os.urandom(16)
+        token = self._fernet(salt).encrypt(json.dumps(session).encode())
+        with self._lock:
+            session_dir = os.path.dirname(self._session_file_path)
+            if session_dir:
+                os.makedirs(session_dir, exist_ok=True)
+            # write to a temp file only we can read and swap it in so a concurrent reader never sees a partial file
+            tmp_file_path = f"{self._session_file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(os.open(tmp_file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as session_file:
+                session_file.write(salt + token)
+            os.replace(tmp_file_path, self._session_file_path)
+
+    def restore(self, driver, url: str) -> bool:
+        """put the saved session into the browser and load url with it, return False if there was nothing to restore"""
+        if not self._secret:
+            return False
+        with self._lock:
+            session = self._load()
+        if session is None:
+            return False
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": session["cookies"]})
+        # Web storage can only be set from a page of the app, set it and load the app again so it starts with it
+        driver.get(url)
+        driver.execute_script(
+            "for (const [key, value] of Object.entries(arguments[0])) { window.localStorage.setItem(key, value); }"
+            "for (const [key, value] of Object.entries(arguments[1])) { window.sessionStorage.setItem(key, value); }",
+            session["local_storage"],
+            session["session_storage"],
+        )
+        driver.get(url)
+        return True
+
+
+bc_vp_session_store = BCVPSessionStore(
+    config(
+        'BC_VP_SESSION_FILE',
+        default=os.path.join(os.path.expanduser("~"), ".aries-mobile-test-harness", "bc_vp_session"),
+    ),
+    config('BC_VP_SESSION_KEY', default=config('BC_VP_PASSWORD', default='')),
+    config('BC_VP_SESSION_MAX_AGE', default=24.0, cast=float),
+)
@@ -1,5 +1,7 @@
 from agent_factory.candy_uvp.pageobjects.webbasepage import WebBasePage
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 from agent_factory.bc_vp.pageobjects.invite_page import InvitePage
 
 # These classes can inherit from a BasePage to do commone setup and functions
@@ -21,10 +23,26 @@ class InvitesPage(WebBasePage):
     save_locator = (By.XPATH, "//button[@class='v-btn v-btn--outlined theme--light v-size--default success--text']")
     #invitation_url_locator = (By.XPATH, '(//a[contains(text(),'https://bcvcpilot-issuer-test.apps.silver.devops.gov.bc.ca')])[1]')
     invitation_url_locator = (By.PARTIAL_LINK_TEXT, 'https://bcvcpilot-issuer-test.apps.silver.devops.gov.bc.ca')
+    table_row_locator = (By.XPATH, "//tbody/tr")
+    signed_out_text_locator = "Sign in to your account"
 
     def on_this_page(self):
         return super().on_this_page(self.on_this_page_text_locator, timeout=1000)
 
+    def wait_for_signed_in(self, timeout=15):
+        """return True once the invites page shows, False if the app went to the sign in page instead"""
+        def settled(driver):
+            page_source = driver.page_source
+            if self.on_this_page_text_locator in page_source:
+                return "signed in"
+            if self.signed_out_text_locator in page_source:
+                return "signed out"
+            return False
+        try:
+            return WebDriverWait(self.driver, timeout).until(settled) == "signed in"
+        except TimeoutException:
+            return False
+
     def search(self, search_term: str):
         if self.on_this_page():
             self.find_by(self.search_locator).send_keys(search_term)
@@ -32,6 +50,17 @@ class InvitesPage(WebBasePage):
         else:
             raise Exception(f"App not on the {type(self)} page")
 
+    def wait_for_search_results(self, search_term: str, timeout=10):
+        """wait until the invites table is filtered down to rows matching search_term"""
+        def filtered(driver):
+            rows = driver.find_elements(*self.table_row_locator)
+            return len(rows) > 0 and all(search_term in row.text for row in rows)
+        try:
+            WebDriverWait(self.driver, timeout).until(filtered)
+            return True
+        except TimeoutException:
+            raise Exception(f"Invites were not filtered by {search_term} within {timeout} seconds")
+
     def new_invite(self):
         if self.on_this_page():
             self.find_by(self.new_invite_locator).click()
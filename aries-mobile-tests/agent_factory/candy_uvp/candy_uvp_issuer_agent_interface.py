@@ -4,12 +4,7 @@ Class for actual CANdy Unverified Person Credetial issuer agent
 import base64
 from agent_factory.issuer_agent_interface import IssuerAgentInterface
 from agent_test_utils import add_border_to_qr_code
-from sys import platform
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
+from browser_pool import browser_pool
 # import Page Objects needed
 from agent_factory.candy_uvp.pageobjects.terms_of_service_page import TermsOfServicePage
 from agent_factory.candy_uvp.pageobjects.request_credential_page import RequestCredentialPage
@@ -40,16 +35,7 @@ class CANdy_UVP_IssuerAgentInterface(IssuerAgentInterface):
     def __init__(self, endpoint):
         # Standup Selenuim Driver with endpoint
         super().__init__(endpoint)
-        if platform == "linux" or platform == "linux2":
-            print("Starting Chromium on linux for Issuer Agent")
-            options = Options()
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--headless")
-            self.driver = webdriver.Chrome(options=options, service=Service(ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()))
-        else:
-            print("Starting Chrome on Mac or Windows for Issuer Agent")
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+        self.driver = browser_pool.lease()
         # go to the issuer endpoint in the browser
         self.driver.get(self.endpoint)
         # instantiate intial page objects
@@ -115,6 +101,10 @@ class CANdy_UVP_IssuerAgentInterface(IssuerAgentInterface):
         if not self._terms_of_service_page.on_this_page():
             raise Exception('Something is wrong, not on the Terms of Service Page for the CANdy UVP Issuer')
 
+    def reset(self):
+        """start the next feature from the first page, keeping the browser"""
+        self.restart_issue_credential()
+
     def revoke_credential(self, publish_immediately=True, notify_holder=False):
         """revoke a credential"""
         return Exception('Function not supported for CANdy UVP Issuer')
@@ -1,8 +1,10 @@
 import time
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from pageobjects.basepage import WaitCondition
+from browser_devtools import NETWORK_STATE_SCRIPT, QR_CODE_RENDERED_SCRIPT
 
 # BasePage to do common setup and functions
 
@@ -68,4 +70,33 @@ class WebBasePage(object):
         return self.driver.page_source
     
     def wait_for_page_load_complete(self, timeout=10):
-        WebDriverWait(self.driver, timeout).until(lambda driver: driver.execute_script('return document.readyState') == 'complete')
\ No newline at end of file
+        WebDriverWait(self.driver, timeout).until(lambda driver: driver.execute_script('return document.readyState') == 'complete')
+
+    def wait_for_network_idle(self, idle_time=0.25, timeout=10):
+        """wait until the page has no requests in flight and has not loaded anything new for idle_time seconds"""
+        quiet = {"resources": None, "since": 0.0}
+        def idle(driver):
+            (ready_state, pending_requests, resources) = driver.execute_script(NETWORK_STATE_SCRIPT)
+            now = time.monotonic()
+            if ready_state == "loading" or pending_requests > 0 or resources != quiet["resources"]:
+                quiet.update(resources=resources, since=now)
+                return False
+            return now - quiet["since"] >= idle_time
+        WebDriverWait(self.driver, timeout, poll_frequency=0.05).until(idle)
+
+    def wait_for_qr_code(self, locator, timeout=20):
+        """return the QR code element as soon as it is drawn, an img that finished loading or a canvas with pixels on it"""
+        qr_code = self.find_by(locator, timeout, WaitCondition.VISIBILITY_OF_ELEMENT_LOCATED)
+        WebDriverWait(self.driver, timeout, poll_frequency=0.05).until(
+            lambda driver: driver.execute_script(QR_CODE_RENDERED_SCRIPT, qr_code)
+        )
+        return qr_code
+
+    def wait_for_page_loaded(self, timeout=10):
+        """wait for the page's requests to finish, if they do within timeout, and for this page's own locators to show up"""
+        try:
+            self.wait_for_network_idle(timeout=timeout)
+        except TimeoutException:
+            # Pages that keep polling never go idle, going by their locators alone is the best we can do for them
+            print(f"{type(self).__name__} was still loading after {timeout} seconds, checking its locators anyway")
+        return self.on_this_page()
\ No newline at end of file
@@ -3,8 +3,9 @@ Absctact Base Class for actual issuer agent interfaces to implement
 """
 
 from abc import ABC, abstractmethod
+from agent_factory.agent_interface_lifecycle import AgentInterfaceLifecycle
 
-class IssuerAgentInterface(ABC):
+class IssuerAgentInterface(AgentInterfaceLifecycle, ABC):
 
     def __init__(self, endpoint):
         self.endpoint = endpoint
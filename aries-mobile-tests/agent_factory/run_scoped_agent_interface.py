@@ -0,0 +1,75 @@
+"""
+Agent interface kept for the whole run instead of being created again for every feature.
+Creating the web based agents means starting headless Chromium, resolving chromedriver and, for BC VP,
+logging in. The interface is created the first time a step uses it, so a run that never touches the verifier
+never builds it. With prewarm it is instead created in a background thread as soon as the run starts, so the
+issuer and verifier are built at the same time and while the first feature gets going.
+Between features the interface is health checked and reset, and only created again if it is broken.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RunScopedAgentInterface():
+
+    _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent-interface")
+
+    def __init__(self, role, build, prewarm=False):
+        """build is called without arguments and returns the agent interface for role, the issuer or verifier"""
+        self._role = role
+        self._build = build
+        self._future = None
+        self.builds = 0
+        if prewarm:
+            self.start()
+
+    def start(self):
+        """start creating the interface in the background if that has not started yet"""
+        if self._future is None:
+            self.builds += 1
+            self._future = self._executor.submit(self._build)
+
+    def get(self):
+        """return the interface, waiting for it to be created"""
+        self.start()
+        return self._future.result()
+
+    def __getattr__(self, name):
+        # Only called for attributes the proxy does not have itself, they all belong to the agent interface
+        return getattr(self.get(), name)
+
+    def check_between_features(self):
+        """reset the interface for the next feature, creating it again if it is broken. Interfaces nobody used yet are left alone"""
+        if self._future is None or not self._future.done():
+            return
+        try:
+            interface = self._future.result()
+            if interface.health_check():
+                interface.reset()
+                return
+            print(f"The {self._role} agent interface failed its health check, creating it again")
+        except Exception as e:
+            print(f"The {self._role} agent interface is broken, creating it again: {e}")
+        self.rebuild()
+
+    def rebuild(self):
+        self.close()
+        self.start()
+
+    def close(self):
+        future = self._future
+        self._future = None
+        if future is None:
+            return
+        try:
+            interface = future.result()
+        except Exception:
+            # It was never created, nothing to close
+            return
+        try:
+            interface.close()
+        except Exception as e:
+            print(f"Could not close the {self._role} agent interface: {e}")
+
+    def report(self) -> str:
+        return f"{self._role} agent interface created {self.builds} times"
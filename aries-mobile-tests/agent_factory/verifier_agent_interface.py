@@ -3,9 +3,10 @@ Absctact Base Class for actual verifier agent interfaces to implement
 """
 
 from abc import ABC, abstractmethod
+from agent_factory.agent_interface_lifecycle import AgentInterfaceLifecycle
 
 
-class VerifierAgentInterface(ABC):
+class VerifierAgentInterface(AgentInterfaceLifecycle, ABC):
 
     def __init__(self, endpoint):
         self.endpoint = endpoint
@@ -3,8 +3,39 @@ import datetime
 import base64
 import json
 import io
+import hashlib
 from qrcode import QRCode
 from PIL import Image, ImageOps
+from sleep_audit import poll_sleep
+
+class QRCodeImage:
+    """An in memory QR code image, handed from the agent that created it to the device service handler that injects it"""
+
+    def __init__(self, png, source_url=None):
+        self.png = png
+        self.source_url = source_url
+        self.base64 = base64.b64encode(png).decode('utf-8')
+        self.content_hash = hashlib.sha256(png).hexdigest()
+
+    @classmethod
+    def from_base64(cls, image, source_url=None):
+        return cls(base64.b64decode(image), source_url)
+
+    def save(self, path='./qrcode.png'):
+        with open(path, 'wb') as qr_code_file:
+            qr_code_file.write(self.png)
+
+    def __str__(self):
+        # Keeps the artifact usable wherever the base64 string was used before
+        return self.base64
+
+
+def as_qr_code_image(image):
+    """return image as a QRCodeImage, accepting the base64 strings older agents return"""
+    if isinstance(image, QRCodeImage):
+        return image
+    return QRCodeImage.from_base64(image)
+
 
 def get_qr_code_from_invitation(invitation_json, print_qr_code=False, save_qr_code=False, qr_code_border=40):
     if "invitation_url" in invitation_json:
@@ -21,16 +52,18 @@ def get_qr_code_from_invitation(invitation_json, print_qr_code=False, save_qr_co
     qr.make()
     #img = qr.make_image(fill_color="red", back_color="#23dda0")
     img = qr.make_image()
-    if save_qr_code:
-        img.save('./qrcode.png')
     if print_qr_code:
         qr.print_ascii(invert=True)
 
     with io.BytesIO() as output:
         img.save(output, format="PNG")
-        contents = base64.b64encode(output.getvalue())
+        qr_code_image = QRCodeImage(output.getvalue(), invitation_url)
+
+    # Only kept on disk for debugging, device service handlers use the image passed to them
+    if save_qr_code:
+        qr_code_image.save()
 
-    return contents.decode('utf-8')
+    return qr_code_image
     
 
 def create_non_revoke_interval(timeframe):
@@ -178,17 +211,31 @@ def table_to_str(table):
 
 def add_border_to_qr_code(qr_code_element, border_size=30):
     # Take a screenshot of the QR code element
-    qr_code_screenshot = qr_code_element.screenshot_as_base64.encode('utf-8')
+    qr_code_screenshot = qr_code_element.screenshot_as_png
 
     # Convert the screenshot to an image
-    qr_code_image = Image.open(io.BytesIO(base64.b64decode(qr_code_screenshot)))
+    qr_code_image = Image.open(io.BytesIO(qr_code_screenshot))
 
     # Add a border to the image
     qr_code_with_border = ImageOps.expand(qr_code_image, border=border_size, fill='white')
 
-    # Convert the modified image back to base64
+    # Convert the modified image back to a QR code image
     buffered = io.BytesIO()
     qr_code_with_border.save(buffered, format="PNG")
-    qr_code_with_border_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
 
-    return qr_code_with_border_base64
\ No newline at end of file
+    return QRCodeImage(buffered.getvalue())
+
+
+def wait_until(condition, timeout=20, initial_interval=0.5, max_interval=4.0, backoff=2.0):
+    """call condition() until it returns something truthy or timeout seconds pass, backing off between calls, return its last result"""
+    deadline = time.monotonic() + timeout
+    interval = initial_interval
+    while True:
+        result = condition()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return result
+        poll_sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
@@ -0,0 +1,103 @@
+"""
+Chrome DevTools helpers for the browsers of the web driven agents.
+Blocks resources the tests never look at, like fonts, media and analytics, so pages are usable sooner, and
+tracks the requests a page has in flight so page objects can wait for the network to go quiet instead of
+waiting a fixed time.
+"""
+
+# Chrome can only block requests by URL through Selenium, resource types are blocked by their file extensions
+RESOURCE_TYPE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "svg", "ico"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "mp3", "ogg", "wav"),
+    "stylesheet": ("css",),
+}
+
+# Counts the fetch and XMLHttpRequest calls in flight, added to every page the browser loads
+REQUEST_TRACKER_SCRIPT = """
+(() => {
+    if (window.__harnessPendingRequests !== undefined) {
+        return;
+    }
+    window.__harnessPendingRequests = 0;
+    performance.setResourceTimingBufferSize(10000);
+    const started = () => { window.__harnessPendingRequests++; };
+    const finished = () => { window.__harnessPendingRequests = Math.max(window.__harnessPendingRequests - 1, 0); };
+    const fetch = window.fetch;
+    if (fetch) {
+        window.fetch = function () {
+            started();
+            try {
+                return fetch.apply(this, arguments).finally(finished);
+            } catch (e) {
+                finished();
+                throw e;
+            }
+        };
+    }
+    const send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        started();
+        this.addEventListener('loadend', finished, { once: true });
+        try {
+            return send.apply(this, arguments);
+        } catch (e) {
+            finished();
+            throw e;
+        }
+    };
+})();
+"""
+
+# [document ready state, requests in flight, resources loaded so far]
+NETWORK_STATE_SCRIPT = """
+return [document.readyState, window.__harnessPendingRequests || 0, performance.getEntriesByType('resource').length];
+"""
+
+# True once a QR code element shows something, an img that finished loading or a canvas with pixels drawn on it
+QR_CODE_RENDERED_SCRIPT = """
+const element = arguments[0];
+if (element.tagName === 'IMG') {
+    return element.complete && element.naturalWidth > 0;
+}
+if (element.tagName === 'CANVAS') {
+    if (!element.width || !element.height) {
+        return false;
+    }
+    const context = element.getContext('2d');
+    if (!context) {
+        return true;
+    }
+    const pixels = context.getImageData(0, 0, element.width, element.height).data;
+    for (let i = 3; i < pixels.length; i += 4) {
+        if (pixels[i]) {
+            return true;
+        }
+    }
+    return false;
+}
+const rect = element.getBoundingClientRect();
+return rect.width > 0 && rect.height > 0;
+"""
+
+
+def install_request_tracker(driver):
+    """turn on the DevTools network domain and track the requests in flight on every page the browser loads"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": REQUEST_TRACKER_SCRIPT})
+
+
+def blocked_url_patterns(resource_types, url_patterns) -> list:
+    patterns = list(url_patterns)
+    for resource_type in resource_types:
+        extensions = RESOURCE_TYPE_EXTENSIONS.get(resource_type)
+        if extensions is None:
+            raise Exception(f"Unknown resource type {resource_type} to block, expected one of {', '.join(RESOURCE_TYPE_EXTENSIONS)}")
+        for extension in extensions:
+            patterns.extend([f"*.{extension}", f"*.{extension}?*"])
+    return patterns
+
+
+def block_resources(driver, resource_types, url_patterns):
+    """block the resource types and URL patterns, replacing what was blocked before"""
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns(resource_types, url_patterns)})
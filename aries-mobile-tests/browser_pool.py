@@ -0,0 +1,272 @@
+"""
+Shared pool of Chrome browsers for the web driven agents, like the CANdy and BC VP issuers and the BC Showcase.
+Starting a browser is slow, and resolving chromedriver with webdriver manager checks the latest version online
+every time. The pool resolves chromedriver once, pinned and cached on disk so it also works offline, and hands
+out browsers that are started ahead of time and kept between leases. A browser is cleaned up when it is given
+back, no windows, cookies, storage or cache of the last lease are left, and is quit and replaced after a
+number of leases so long runs don't pile up browser state.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sys import platform
+from urllib.parse import urlparse
+from decouple import config, Csv
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import ChromeType
+from browser_devtools import block_resources, install_request_tracker
+
+_chromedriver_lock = threading.Lock()
+_chromedriver_paths = {}
+
+
+def _read_chromedriver_cache(cache_file) -> dict:
+    try:
+        with open(cache_file) as cache:
+            return json.load(cache)
+    except (OSError, ValueError):
+        return {}
+
+
+def resolve_chromedriver(chrome_type) -> str:
+    """
+    return the path to chromedriver. CHROMEDRIVER_PATH is used as is. Otherwise webdriver manager installs
+    CHROMEDRIVER_VERSION, or the latest version, and the path it gives is kept in CHROMEDRIVER_CACHE. A cached
+    path is used without going online, until CHROMEDRIVER_CACHE_MAX_AGE hours have passed when no version is pinned,
+    and even then when the version check fails.
+    """
+    path = config('CHROMEDRIVER_PATH', default='')
+    if path:
+        return path
+    version = config('CHROMEDRIVER_VERSION', default='')
+    key = f"{chrome_type}:{version or 'latest'}"
+    with _chromedriver_lock:
+        if key in _chromedriver_paths:
+            return _chromedriver_paths[key]
+        cache_file = config('CHROMEDRIVER_CACHE', default=os.path.join(os.path.expanduser("~"), ".wdm", "chromedriver-paths.json"))
+        max_age = config('CHROMEDRIVER_CACHE_MAX_AGE', default=24.0, cast=float) * 3600
+        cache = _read_chromedriver_cache(cache_file)
+        (cached_path, resolved_at) = cache.get(key, (None, 0.0))
+        cached = cached_path is not None and os.path.exists(cached_path)
+        if cached and (version or time.time() - resolved_at < max_age):
+            path = cached_path
+        else:
+            try:
+                path = ChromeDriverManager(driver_version=version or None, chrome_type=chrome_type).install()
+            except Exception as e:
+                if not cached:
+                    raise
+                print(f"Could not check for a newer chromedriver, using {cached_path}: {e}")
+                path = cached_path
+            else:
+                cache[key] = (path, time.time())
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                with open(cache_file, "w") as cache_out:
+                    json.dump(cache, cache_out)
+        _chromedriver_paths[key] = path
+        return path
+
+
+class BrowserPool():
+
+    def __init__(self, size=4, max_uses=20, lease_timeout=300.0, blocked_resource_types=(), blocked_urls=()):
+        self.size = size
+        self.max_uses = max_uses
+        self.lease_timeout = lease_timeout
+        self.blocked_resource_types = tuple(blocked_resource_types)
+        self.blocked_urls = tuple(blocked_urls)
+        self._idle = []
+        # leased browser -> number of times it was leased
+        self._leased = {}
+        self._uses = {}
+        self._starting = 0
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="browser-pool")
+        self.browsers_started = 0
+        self.browsers_recycled = 0
+        self.lease_waits = []
+
+    def _browser_count(self) -> int:
+        return len(self._idle) + len(self._leased) + self._starting
+
+    def _start_browser(self):
+        if platform == "linux" or platform == "linux2":
+            print("Starting Chromium on linux for the browser pool")
+            options = Options()
+            options.add_argument("--no-sandbox")
+            options.add_argument("--disable-dev-shm-usage")
+            options.add_argument("--headless")
+            options.add_argument("--enable-javascript")
+            driver = webdriver.Chrome(options=options, service=Service(resolve_chromedriver(ChromeType.CHROMIUM)))
+        else:
+            print("Starting Chrome on Mac or Windows for the browser pool")
+            driver = webdriver.Chrome(service=Service(resolve_chromedriver(ChromeType.GOOGLE)))
+        try:
+            install_request_tracker(driver)
+        except Exception:
+            driver.quit()
+            raise
+        with self._condition:
+            self.browsers_started += 1
+            self._uses[driver] = 0
+        return driver
+
+    def _start_idle_browser(self):
+        # Runs in the background, the caller already counted the browser as starting
+        driver = None
+        try:
+            driver = self._start_browser()
+        except Exception as e:
+            print(f"Could not start a browser for the pool: {e}")
+        with self._condition:
+            self._starting -= 1
+            if driver is not None:
+                self._idle.append(driver)
+            self._condition.notify_all()
+
+    def prewarm(self, count: int):
+        """start browsers in the background until the pool has count of them"""
+        with self._condition:
+            while self._browser_count() < min(count, self.size):
+                self._starting += 1
+                self._executor.submit(self._start_idle_browser)
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def lease(self, blocked_resource_types=()):
+        """
+        return a clean browser, starting one when none is idle, waiting when the pool is full. The browser blocks
+        the pool's resource types and URLs, and also blocked_resource_types for this lease
+        """
+        started_at = time.monotonic()
+        deadline = started_at + self.lease_timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._browser_count() >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Exception(f"No browser was free in the pool of {self.size} after {self.lease_timeout} seconds")
+                    self._condition.wait(remaining)
+                driver = self._idle.pop() if self._idle else None
+                if driver is None:
+                    self._starting += 1
+            started = driver is None
+            if started:
+                try:
+                    driver = self._start_browser()
+                except Exception:
+                    with self._condition:
+                        self._starting -= 1
+                        self._condition.notify_all()
+                    raise
+            elif not self._is_healthy(driver):
+                self._discard(driver)
+                continue
+            with self._condition:
+                if started:
+                    self._starting -= 1
+                self._uses[driver] += 1
+                self._leased[driver] = self._uses[driver]
+                self.lease_waits.append(time.monotonic() - started_at)
+            try:
+                block_resources(driver, self.blocked_resource_types + tuple(blocked_resource_types), self.blocked_urls)
+            except Exception:
+                with self._condition:
+                    self._leased.pop(driver, None)
+                self._discard(driver)
+                raise
+            return driver
+
+    def _clean(self, driver) -> bool:
+        """clear what the last lease left behind in the browser, return False if that did not work"""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            origins = {urlparse(driver.current_url)._replace(path="", params="", query="", fragment="").geturl()}
+            for cookie in driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]:
+                domain = cookie["domain"].lstrip(".")
+                origins.update([f"https://{domain}", f"http://{domain}"])
+            for origin in origins:
+                if origin.startswith("http"):
+                    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"Could not clean up a browser from the pool, replacing it: {e}")
+            return False
+
+    def release(self, driver):
+        """give a leased browser back to the pool. Browsers that were not leased from the pool are quit"""
+        with self._condition:
+            uses = self._leased.pop(driver, None)
+        if uses is None:
+            driver.quit()
+            return
+        if uses < self.max_uses and self._clean(driver):
+            with self._condition:
+                self._idle.append(driver)
+                self._condition.notify_all()
+            return
+        with self._condition:
+            self.browsers_recycled += 1
+            # Replace it in the background so the next lease does not wait for a browser to start
+            self._starting += 1
+            self._executor.submit(self._start_idle_browser)
+        self._discard(driver)
+
+    def _discard(self, driver):
+        with self._condition:
+            self._uses.pop(driver, None)
+            self._condition.notify_all()
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Could not quit a browser from the pool: {e}")
+
+    def close(self):
+        """quit every browser in the pool"""
+        self._executor.shutdown(wait=True)
+        with self._condition:
+            drivers = self._idle + list(self._leased)
+            self._idle = []
+            self._leased = {}
+        for driver in drivers:
+            self._discard(driver)
+
+    def report(self) -> str:
+        leases = len(self.lease_waits)
+        average_wait = sum(self.lease_waits) / leases if leases else 0.0
+        max_wait = max(self.lease_waits, default=0.0)
+        return (
+            f"Browser pool: {leases} leases, {self.browsers_started} browsers started, {self.browsers_recycled} recycled, "
+            f"lease wait {average_wait:.2f}s average, {max_wait:.2f}s max"
+        )
+
+
+browser_pool = BrowserPool(
+    size=config('BROWSER_POOL_SIZE', default=4, cast=int),
+    max_uses=config('BROWSER_POOL_MAX_USES', default=20, cast=int),
+    lease_timeout=config('BROWSER_POOL_LEASE_TIMEOUT', default=300.0, cast=float),
+    blocked_resource_types=config('BROWSER_BLOCKED_RESOURCE_TYPES', default="font,media", cast=Csv()),
+    blocked_urls=config(
+        'BROWSER_BLOCKED_URLS',
+        default="*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*hotjar.com*,*snowplow*",
+        cast=Csv(),
+    ),
+)
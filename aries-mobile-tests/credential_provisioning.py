@@ -0,0 +1,51 @@
+"""
+Work out which schema and credential definition combinations the selected scenarios need, from
+the cred_data_* files referenced in their steps, step tables and examples, so an issuer can
+create them all before the first scenario starts.
+"""
+
+import json
+import os
+import re
+
+CRED_DATA_PATTERN = re.compile(r"\bcred_data_\w+")
+REVOCABLE_STEP_PATTERN = re.compile(r"with revocable set as (True|False)")
+
+
+def _scenario_credential_references(scenario):
+    """yield (cred_data name, revocable) for every credential the scenario's steps mention. revocable is None when not given"""
+    for step in scenario.all_steps:
+        revocable_match = REVOCABLE_STEP_PATTERN.search(step.name)
+        step_revocable = revocable_match.group(1) == "True" if revocable_match else None
+        for credential in CRED_DATA_PATTERN.findall(step.name):
+            yield (credential, step_revocable)
+        if step.table:
+            for row in step.table.rows:
+                row_revocable = row["revocable"] == "True" if "revocable" in step.table.headings else None
+                for cell in row.cells:
+                    for credential in CRED_DATA_PATTERN.findall(cell):
+                        yield (credential, row_revocable)
+
+
+def credential_definitions_needed(features, config, data_dir) -> list:
+    """return a list of (schema json, revocable) pairs needed by the scenarios that will run with this config"""
+    references = set()
+    for feature in features:
+        for scenario in feature.walk_scenarios():
+            if scenario.should_run(config):
+                references.update(_scenario_credential_references(scenario))
+
+    needed = {}
+    for (credential, revocable) in references:
+        try:
+            with open(os.path.join(data_dir, f"{credential.lower()}.json")) as credential_json_file:
+                schema_name = json.load(credential_json_file)["schema_name"]
+            with open(os.path.join(data_dir, f"schema_{schema_name.lower()}.json")) as schema_json_file:
+                schema_json = json.load(schema_json_file)
+        except (FileNotFoundError, KeyError):
+            # Not an AATH style credential with a schema file, the issuer handles these itself
+            continue
+        if revocable is None:
+            revocable = schema_json.get("support_revocation", False) == True
+        needed[(schema_json["schema_name"], schema_json["schema_version"], revocable)] = (schema_json, revocable)
+    return list(needed.values())
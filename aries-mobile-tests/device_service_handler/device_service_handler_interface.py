@@ -5,8 +5,12 @@ Absctact Base Class for actual device service handler interfaces to implement
 from abc import ABC, abstractmethod
 from appium import webdriver
 from appium.options.common import AppiumOptions
+from concurrent.futures import ThreadPoolExecutor
+from decouple import config
+import copy
 import os
 import json
+import threading
 
 
 class DeviceServiceHandlerInterface(ABC):
@@ -14,6 +18,21 @@ class DeviceServiceHandlerInterface(ABC):
     _CONFIG: dict
     _driver: webdriver
     _options: AppiumOptions
+    # Session kept between scenarios when APPIUM_SESSION_POOL is on, with the capabilities it was created for
+    _pooled_driver: webdriver = None
+    _pooled_session_key: str = None
+    _current_session_key: str = None
+    # driver.reset() and clearing app data do not reset the app on iOS, so iOS sessions are not reused
+    reusable_platforms = ("android",)
+    sessions_created = 0
+    sessions_reused = 0
+    # Session being created in the background for the next scenario, with the capabilities it was requested with
+    _prepared_driver = None
+    _prepared_identity: str = None
+    _background = None
+    sessions_prepared = 0
+    # Sessions quit in the background that the device service may still be running
+    _pending_quits = 0
 
     def __init__(self, config_file_path: str):
         print("Path to the config file = %s" % (config_file_path))
@@ -24,6 +43,7 @@ class DeviceServiceHandlerInterface(ABC):
         # This can be overridden if the user calls this method again with parameters.
         self.set_device_service_specific_options()
         self._options = AppiumOptions()
+        self._pending_quits_lock = threading.Lock()
 
     @abstractmethod
     def set_device_service_specific_options(self, options:dict=None, command_executor_url:str=None):
@@ -40,16 +60,232 @@ class DeviceServiceHandlerInterface(ABC):
         else:
             url = command_executor_url
             
-        self._driver = webdriver.Remote(
-            options=self._options,
+        self._driver = self._create_driver(self._options, url)
+        return self._driver
+
+    def _create_driver(self, options: AppiumOptions, url: str) -> webdriver:
+        return webdriver.Remote(
+            options=options,
             command_executor=url,
             keep_alive=False
         )
-        return self._driver
+
+    def _get_background(self) -> ThreadPoolExecutor:
+        if self._background is None:
+            self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="appium-session")
+        return self._background
+
+    def _session_identity(self) -> str:
+        """the full desired capabilities, name included, a prepared session is only used by the scenario it was named for"""
+        return json.dumps(getattr(self, '_desired_capabilities', {}), sort_keys=True)
+
+    def session_concurrency(self) -> int:
+        """how many sessions the device service account can run at once"""
+        return config('DEVICE_SERVICE_CONCURRENCY', default=1, cast=int)
+
+    def _live_sessions(self) -> int:
+        """the sessions this handler has on the device service, counting the ones still being quit in the background"""
+        with self._pending_quits_lock:
+            live = self._pending_quits
+        if getattr(self, '_driver', None) is not None:
+            live += 1
+        if self._pooled_driver is not None:
+            live += 1
+        if self._prepared_driver is not None:
+            live += 1
+        return live
+
+    def prepare_next_driver(self, config: dict):
+        """
+        start creating the session for the next scenario in the background, config being the extra capabilities that
+        scenario will pass to set_desired_capabilities, or None when there is no next scenario. Only done when the
+        device service has room for another session, and not when the current session will be reused from the pool anyway.
+        A prepared session that is not for the next scenario is quit. Call it close to the end of the current scenario,
+        Appium and the device services end a session that sits idle for a minute or so.
+        """
+        if self._prepared_driver is None and (config is None or self.session_concurrency() < 2):
+            return
+        identity = None
+        if config is not None:
+            # Work out the next scenario's capabilities the same way set_desired_capabilities does, then put back the current ones
+            saved_state = (self._CONFIG, getattr(self, '_desired_capabilities', None), self._options)
+            try:
+                self._CONFIG = copy.deepcopy(self._CONFIG)
+                self._options = copy.deepcopy(self._options)
+                self.set_desired_capabilities(dict(config))
+                (options, identity, url) = (self._options, self._session_identity(), self._url)
+            finally:
+                (self._CONFIG, self._desired_capabilities, self._options) = saved_state
+        if self._prepared_driver is not None:
+            if self._prepared_identity == identity:
+                return
+            self._discard_prepared_driver()
+        if config is None:
+            return
+        current_driver = getattr(self, '_driver', None)
+        if self.session_pool_enabled() and current_driver is not None and self._can_reuse(current_driver):
+            return
+        if self._live_sessions() >= self.session_concurrency():
+            print("No room on the device service for the next scenario's session yet, it will be started when that scenario begins")
+            return
+        self._prepared_identity = identity
+        self._prepared_driver = self._get_background().submit(self._create_driver, options, url)
+        self.sessions_prepared += 1
+
+    def _discard_prepared_driver(self):
+        self._submit_quit(self._quit_prepared_driver, self._prepared_driver)
+        self._prepared_driver = None
+        self._prepared_identity = None
+
+    def _take_prepared_driver(self):
+        """return the prepared session if it was prepared for the current capabilities"""
+        prepared = self._prepared_driver
+        if prepared is None:
+            return None
+        if self._prepared_identity != self._session_identity():
+            # Prepared for a later scenario, like when the current one is retried. prepare_next_driver quits it
+            # once the scenario after this one is known, if it is not for that one either
+            return None
+        self._prepared_driver = None
+        try:
+            driver = prepared.result()
+        except Exception as e:
+            print(f"Creating the Appium session in the background failed, starting a new session: {e}")
+            return None
+        # Appium or the device service may have ended it while it waited, like after a retry of the current scenario
+        if not self._is_healthy(driver):
+            self._quit_driver(driver)
+            return None
+        return driver
+
+    def session_pool_enabled(self) -> bool:
+        return config('APPIUM_SESSION_POOL', default=False, cast=bool)
+
+    def _session_key(self) -> str:
+        """the desired capabilities without the per scenario name, sessions are only reused when these match"""
+        capabilities = copy.deepcopy(getattr(self, '_desired_capabilities', {}))
+        for value in [capabilities] + [value for value in capabilities.values() if isinstance(value, dict)]:
+            value.pop('name', None)
+        return json.dumps(capabilities, sort_keys=True)
+
+    def _can_reuse(self, driver) -> bool:
+        return str(driver.capabilities.get('platformName', '')).lower() in self.reusable_platforms
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            driver.get_window_size()
+            return True
+        except Exception as e:
+            print(f"Appium session {driver.session_id} failed its health check, starting a new session: {e}")
+            return False
+
+    def _app_id(self, driver) -> str:
+        capabilities = driver.capabilities
+        return capabilities.get('appPackage') or capabilities.get('appium:appPackage') or driver.current_package
+
+    def reset_app_state(self, driver):
+        """put the app back in its first launch state on a reused session, like the fullReset a new session gets"""
+        app_id = self._app_id(driver)
+        driver.terminate_app(app_id)
+        driver.execute_script('mobile: clearApp', {'appId': app_id})
+        # Clearing the app data revokes its permissions, grant them again like a fresh install would
+        if driver.capabilities.get('autoGrantPermissions'):
+            driver.execute_script('mobile: changePermissions', {'permissions': 'all', 'appPackage': app_id})
+        driver.activate_app(app_id)
+
+    def acquire_driver(self) -> webdriver:
+        """
+        return the driver for the next scenario. With APPIUM_SESSION_POOL on, the session of the last scenario is
+        reused with the app reset, unless the desired capabilities changed or the session is no longer healthy.
+        A reused session keeps the name it was created with on the device service.
+        """
+        self._current_session_key = self._session_key()
+        driver = self._pooled_driver
+        self._pooled_driver = None
+        if driver is not None:
+            if self._pooled_session_key == self._current_session_key and self._is_healthy(driver):
+                try:
+                    self.reset_app_state(driver)
+                    self._driver = driver
+                    self.sessions_reused += 1
+                    return driver
+                except Exception as e:
+                    print(f"Could not reset the app on pooled Appium session {driver.session_id}, starting a new session: {e}")
+            self._quit_driver(driver)
+        self.sessions_created += 1
+        driver = self._take_prepared_driver()
+        if driver is not None:
+            self._driver = driver
+            return driver
+        return self.initialize_driver()
+
+    def release_driver(self, driver, reusable=True):
+        """keep the session for the next scenario if pooling is on and it can be reused, otherwise quit it"""
+        if reusable and self.session_pool_enabled() and self._can_reuse(driver):
+            self._pooled_driver = driver
+            self._pooled_session_key = self._current_session_key
+        else:
+            self._quit_driver(driver)
+
+    def close_session_pool(self):
+        """quit the pooled and any unused prepared session, and wait for the background quits to finish"""
+        if self._pooled_driver is not None:
+            self._quit_driver(self._pooled_driver)
+            self._pooled_driver = None
+        if self._prepared_driver is not None:
+            self._discard_prepared_driver()
+        if self._background is not None:
+            self._background.shutdown(wait=True)
+            self._background = None
+
+    def _quit_driver(self, driver):
+        """quit the session in the background, the next scenario does not need to wait on the device service"""
+        if config('APPIUM_ASYNC_QUIT', default=True, cast=bool):
+            self._submit_quit(self._quit_driver_now, driver)
+        else:
+            self._quit_driver_now(driver)
+
+    def _submit_quit(self, quit, driver):
+        """run quit(driver) in the background, counting the session as live until it is done"""
+        with self._pending_quits_lock:
+            self._pending_quits += 1
+        try:
+            self._get_background().submit(self._run_quit, quit, driver)
+        except Exception:
+            with self._pending_quits_lock:
+                self._pending_quits -= 1
+            raise
+
+    def _run_quit(self, quit, driver):
+        try:
+            quit(driver)
+        finally:
+            with self._pending_quits_lock:
+                self._pending_quits -= 1
+
+    def _quit_driver_now(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Could not quit Appium session {driver.session_id}: {e}")
+
+    def _quit_prepared_driver(self, prepared):
+        try:
+            driver = prepared.result()
+        except Exception:
+            # It was never created, nothing to quit
+            return
+        self._quit_driver_now(driver)
+
+    def session_pool_report(self) -> str:
+        return f"Appium sessions: {self.sessions_created} created, {self.sessions_reused} reused, {self.sessions_prepared} prepared in the background"
 
     @abstractmethod
     def inject_qrcode(self, image):
-        """pass the qrcode image to the device in a way that allows for the device to scan it when the camera opens"""
+        """pass the qrcode image to the device in a way that allows for the device to scan it when the camera opens, image is an agent_test_utils.QRCodeImage"""
+
+    async def preupload_qrcode_async(self, image):
+        """get a qrcode image ready on the device service before it is injected, for device services that upload images"""
 
     @abstractmethod
     def biometrics_authenticate(self, authenticate:bool):
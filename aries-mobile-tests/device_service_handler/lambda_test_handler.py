@@ -7,9 +7,7 @@ import json
 from decouple import config
 from appium import webdriver
 import requests
-import aiohttp
-import asyncio
-import os 
+from device_service_handler.lambda_test_media_cache import LambdaTestMediaCache
 
 
 
@@ -21,10 +19,11 @@ class LambdaTestHandler(DeviceServiceHandlerInterface):
     _api_endpoint: str
     _lambda_username: str
     _lambda_access_key: str
+    _media_cache: LambdaTestMediaCache = None
 
     def __init__(self, config_file_path: str):
         super().__init__(config_file_path)
-        self._api_endpoint = 'https://mobile-mgm.lambdatest.com/mfs/v1.0/media/upload'
+        self._api_endpoint = config('LAMBDA_TEST_MEDIA_UPLOAD_URL', default='https://mobile-mgm.lambdatest.com/mfs/v1.0/media/upload')
 
     def set_desired_capabilities(self, config: dict = None):
         """set extra capabilities above what was in the config file"""
@@ -70,26 +69,30 @@ class LambdaTestHandler(DeviceServiceHandlerInterface):
 
         # print(url)
 
-    async def save_qr_code_to_lambda_test(self, data):
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self._api_endpoint, auth=aiohttp.BasicAuth(self._lambda_username, self._lambda_access_key), data=data) as resp:
-                result = await resp.json()
-                return result['media_url']
-
-
+    def _get_media_cache(self) -> LambdaTestMediaCache:
+        if self._media_cache is None:
+            self._media_cache = LambdaTestMediaCache(
+                self._api_endpoint,
+                self._lambda_username,
+                self._lambda_access_key,
+                ttl=config('LAMBDA_TEST_MEDIA_CACHE_TTL', default=3600.0, cast=float),
+            )
+        return self._media_cache
+
+    def media_cache_report(self) -> str:
+        if self._media_cache is None:
+            return "LambdaTest media cache: no QR code images uploaded"
+        return self._media_cache.report()
 
     def inject_qrcode(self, image):
         """save qrcode image to the device in lambda test in a way that allows for the device to scan it when the camera opens"""
-        # get current directory
-        with open(os.path.dirname(__file__) + '/../qrcode.png', 'rb') as img:
-            print(img)
-            payload = {
-                'media_file': img,
-                'type': 'image',
-                'custom_id': 'QRCodeImage'
-            }
-            image_url = asyncio.run(self.save_qr_code_to_lambda_test(payload))
-            self._driver.execute_script(f"lambda-image-injection={image_url}")
+        # An image that was already uploaded, like on a rescan or when it was pre uploaded, is not sent again
+        image_url = self._get_media_cache().get_media_url(image)
+        self._driver.execute_script(f"lambda-image-injection={image_url}")
+
+    async def preupload_qrcode_async(self, image):
+        """upload the qrcode image ahead of inject_qrcode so the injection does not wait on the upload"""
+        await self._get_media_cache().get_media_url_async(image)
 
     def biometrics_authenticate(self, authenticate:bool):
         """authenticate when biometrics, ie fingerprint or faceid, true is success, false is fail biometrics"""
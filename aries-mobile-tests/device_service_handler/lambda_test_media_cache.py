@@ -0,0 +1,41 @@
+"""
+Content addressed cache of LambdaTest media uploads.
+The same QR code image is only uploaded once, later injections of it reuse the media_url LambdaTest
+returned until it expires. Uploads run on the agent controller loop through its pooled session.
+"""
+
+import aiohttp
+from agent_controller_client import SingleFlightCache, agent_controller_transport, run_on_agent_controller_loop
+from agent_test_utils import as_qr_code_image
+
+
+class LambdaTestMediaCache(SingleFlightCache):
+
+    def __init__(self, api_endpoint, username, access_key, ttl=3600.0):
+        super().__init__()
+        self.api_endpoint = api_endpoint
+        self._auth = aiohttp.BasicAuth(username, access_key)
+        self.ttl = ttl
+
+    async def _upload(self, qr_code_image) -> str:
+        payload = aiohttp.FormData()
+        payload.add_field('media_file', qr_code_image.png, filename='qrcode.png', content_type='image/png')
+        payload.add_field('type', 'image')
+        payload.add_field('custom_id', 'QRCodeImage')
+        session = agent_controller_transport.get_session(self.api_endpoint)
+        async with session.post(self.api_endpoint, auth=self._auth, data=payload) as resp:
+            if resp.status != 200:
+                raise Exception(f"Upload of the QR code image to LambdaTest failed: {resp.status}; {await resp.text()}")
+            result = await resp.json(content_type=None)
+            return result['media_url']
+
+    async def get_media_url_async(self, image) -> str:
+        """return the media_url of image, uploading it only if it is not already cached or being uploaded"""
+        qr_code_image = as_qr_code_image(image)
+        return await self.get_or_fetch(qr_code_image.content_hash, lambda: self._upload(qr_code_image), self.ttl)
+
+    def get_media_url(self, image) -> str:
+        return run_on_agent_controller_loop(self.get_media_url_async, image)
+
+    def report(self) -> str:
+        return f"LambdaTest media cache: {self.misses} uploads, {self.hits + self.coalesced} reused, {self.saved_latency:.2f}s of uploading saved"
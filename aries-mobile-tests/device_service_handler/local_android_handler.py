@@ -6,7 +6,7 @@ from device_service_handler.device_service_handler_interface import DeviceServic
 import json
 from decouple import config
 from appium import webdriver
-import shutil
+from agent_test_utils import as_qr_code_image
 import requests
 import subprocess
 
@@ -39,9 +39,7 @@ class LocalAndroidHandler(DeviceServiceHandlerInterface):
         # get the android home environment variable
         android_home = config('ANDROID_HOME')
         # write the qrcode png to the {android_home}/emulator/resources
-
-        shutil.copy(
-            "qrcode.png", f"{android_home}/emulator/resources/qrcode.png")
+        as_qr_code_image(image).save(f"{android_home}/emulator/resources/qrcode.png")
 
     def biometrics_authenticate(self, authenticate: bool, finger_id: int = 1):
         """authenticate when biometrics, ie fingerprint or faceid, true is success, false is fail biometrics"""
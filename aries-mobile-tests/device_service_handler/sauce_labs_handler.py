@@ -6,6 +6,7 @@ from device_service_handler.device_service_handler_interface import DeviceServic
 import json
 from decouple import config
 from appium import webdriver
+from agent_test_utils import as_qr_code_image
 
 
 class SauceLabsHandler(DeviceServiceHandlerInterface):
@@ -81,7 +82,7 @@ class SauceLabsHandler(DeviceServiceHandlerInterface):
 
     def inject_qrcode(self, image):
         """pass the qrcode image to the device in a way that allows for the device to scan it when the camera opens"""
-        self._driver.execute_script(f"sauce:inject-image={image}")
+        self._driver.execute_script(f"sauce:inject-image={as_qr_code_image(image).base64}")
 
     def biometrics_authenticate(self, authenticate:bool):
         """authenticate when biometrics, ie fingerprint or faceid, true is success, false is fail biometrics"""
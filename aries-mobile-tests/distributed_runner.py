@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Run the selected scenarios across workers on several nodes, through a shared scenario queue.
+
+    # once, on the coordinator, with the same tag arguments as behave
+    ./distributed_runner.py publish --queue /shared/run.db --tags=@bc_wallet
+
+    # on every node, N local workers keep pulling scenarios until the queue is empty
+    ./distributed_runner.py work --queue /shared/run.db --workers 2 -f allure_behave.formatter:AllureFormatter -o ./allure/allure-results
+
+    # once all nodes are done, on the coordinator
+    ./distributed_runner.py merge --queue /shared/run.db --into ./allure/allure-results <allure-results of every node>...
+
+Scenarios are handed out heaviest first, a few at a time, to whichever worker is free, so a slow scenario
+no longer holds back a whole shard. Every worker reports each scenario's result back to the queue from
+after_scenario. Without a command the runner works, with the queue from SCENARIO_QUEUE, which is how
+manage starts it in the test container.
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from behave.configuration import Configuration
+from decouple import config
+from parallel_runner import select_scenarios, scenario_weight, worker_args, worker_environment, WORKER_RESULTS_DIR
+from scenario_queue import ScenarioQueue
+
+COMMANDS = ("publish", "work", "merge", "status")
+
+
+def create_queue(path: str) -> ScenarioQueue:
+    return ScenarioQueue(
+        path,
+        lease=config('SCENARIO_QUEUE_LEASE', default=1800.0, cast=float),
+        max_attempts=config('SCENARIO_QUEUE_MAX_ATTEMPTS', default=2, cast=int),
+    )
+
+
+def publish(queue: ScenarioQueue, behave_args: list) -> int:
+    scenarios = select_scenarios(behave_args)
+    queue.publish([(str(scenario.location), scenario.name, scenario_weight(scenario)) for scenario in scenarios])
+    print(f"Published {len(scenarios)} scenarios to {queue.path}")
+    return 0
+
+
+def work_loop(queue: ScenarioQueue, worker_id: str, index: int, workers: int, behave_args: list, batch: int, poll_interval: float):
+    """claim scenarios and run them with behave until the queue is empty"""
+    paths = Configuration(command_args=behave_args).paths
+    args = worker_args(behave_args, paths, worker_id)
+    env = worker_environment(index, workers)
+    env['SCENARIO_QUEUE'] = queue.path
+    env['SCENARIO_QUEUE_WORKER'] = worker_id
+    worker_dir = os.path.join(WORKER_RESULTS_DIR, worker_id)
+    os.makedirs(worker_dir, exist_ok=True)
+    with open(os.path.join(worker_dir, "behave.log"), "a") as log_file:
+        while True:
+            locations = queue.claim(worker_id, batch)
+            if not locations:
+                if queue.is_done():
+                    return
+                # Everything left is claimed by other workers, wait in case one of their leases runs out
+                time.sleep(poll_interval)
+                continue
+            print(f"{worker_id}: running {', '.join(locations)}")
+            log_file.flush()
+            subprocess.run(["behave"] + args + locations, stdout=log_file, stderr=subprocess.STDOUT, env=env)
+            queue.release(worker_id, locations)
+
+
+def work(queue: ScenarioQueue, behave_args: list, workers: int) -> int:
+    node = config('SCENARIO_QUEUE_NODE', default=socket.gethostname())
+    batch = config('SCENARIO_QUEUE_BATCH', default=3, cast=int)
+    poll_interval = config('SCENARIO_QUEUE_POLL_INTERVAL', default=30.0, cast=float)
+    threads = [
+        threading.Thread(
+            target=work_loop,
+            args=(queue, f"{node}-{index}", index, workers, behave_args, batch, poll_interval),
+            name=f"{node}-{index}",
+        )
+        for index in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(queue.summary())
+    return 0
+
+
+def read_properties(path: str) -> list:
+    with open(path) as properties_file:
+        return [line.strip().split("=", 1) for line in properties_file if "=" in line and not line.startswith("#")]
+
+
+def merge(queue: ScenarioQueue, target: str, sources: list) -> int:
+    """copy the allure results of every node into target, with one environment.properties covering all of them"""
+    os.makedirs(target, exist_ok=True)
+    properties = {}
+    target_properties = os.path.join(target, "environment.properties")
+    property_files = [target_properties] if os.path.exists(target_properties) else []
+    for source in sources:
+        for (directory, _, file_names) in os.walk(source):
+            for file_name in file_names:
+                source_path = os.path.join(directory, file_name)
+                if file_name == "environment.properties":
+                    if os.path.abspath(source_path) != os.path.abspath(target_properties):
+                        property_files.append(source_path)
+                    continue
+                if os.path.abspath(directory) == os.path.abspath(target):
+                    continue
+                # Allure result files have unique names, anything else that clashes is kept under a new name
+                target_path = os.path.join(target, file_name)
+                if os.path.exists(target_path):
+                    target_path = os.path.join(target, f"{os.path.basename(directory)}-{file_name}")
+                shutil.copy2(source_path, target_path)
+
+    # Nodes can run on different devices, list every value a property had
+    for property_file in property_files:
+        for (key, value) in read_properties(property_file):
+            values = properties.setdefault(key, [])
+            for part in value.split(", "):
+                if part not in values:
+                    values.append(part)
+    properties["execution.workers"] = queue.workers()
+    with open(target_properties, "w") as properties_file:
+        for (key, values) in properties.items():
+            properties_file.write(f"{key}={', '.join(values)}\n")
+
+    print(queue.summary())
+    return 0 if all([state in ("passed", "skipped") for (_, _, state, _, _, _) in queue.results()]) else 1
+
+
+def main(argv: list) -> int:
+    if argv and argv[0] in COMMANDS:
+        (command, argv) = (argv[0], argv[1:])
+    else:
+        command = "work"
+    parser = argparse.ArgumentParser(description="Run behave scenarios from a shared queue", add_help=False)
+    parser.add_argument("--queue", default=config('SCENARIO_QUEUE', default="scenario_queue.db"))
+    parser.add_argument("--workers", type=int, default=config('PARALLEL_WORKERS', default=1, cast=int))
+    parser.add_argument("--into", default="./allure/allure-results")
+    (options, remaining) = parser.parse_known_args(argv)
+    queue = create_queue(options.queue)
+    if command == "publish":
+        return publish(queue, remaining)
+    elif command == "work":
+        return work(queue, remaining, options.workers)
+    elif command == "merge":
+        return merge(queue, options.into, remaining)
+    print(queue.summary())
+    return 0 if queue.is_done() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
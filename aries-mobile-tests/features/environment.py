@@ -5,6 +5,9 @@
 # https://behave.readthedocs.io/en/latest/tutorial.html#environmental-controls
 #  
 # -----------------------------------------------------------
+# Record the fixed sleeps left in the harness, installed before anything else imports time.sleep
+from sleep_audit import install_sleep_audit
+sleep_audit = install_sleep_audit()
 from appium import webdriver
 from behave.model_core import Status
 import allure
@@ -12,10 +15,16 @@ from sauceclient import SauceClient
 from decouple import config
 import os, json
 import hmac
+import socket
 from hashlib import md5
 from agent_factory.agent_interface_factory import AgentInterfaceFactory
+from agent_factory.run_scoped_agent_interface import RunScopedAgentInterface
+from browser_pool import browser_pool
 from device_service_handler.device_service_handler_factory import DeviceServiceHandlerFactory
+from agent_controller_client import agent_controller_cache, agent_webhook_listener, webhook_listener_enabled
+from credential_provisioning import credential_definitions_needed
 from behave.contrib.scenario_autoretry import patch_scenario_with_autoretry
+from scenario_queue import ScenarioQueue
 
 # Get teh Device Cloud Service passed in from manage
 device_cloud_service = config('DEVICE_CLOUD')
@@ -32,6 +41,69 @@ except:
 dcshf = DeviceServiceHandlerFactory()
 device_service_handler = dcshf.create_device_service_handler(device_cloud_service, config_file_path)
 
+# Workers of a distributed run report every scenario's result back to the queue they pull scenarios from
+scenario_queue = ScenarioQueue(config('SCENARIO_QUEUE')) if config('SCENARIO_QUEUE', default='') else None
+
+# Start the optional webhook listener so agent interfaces are notified of state changes instead of polling
+if webhook_listener_enabled():
+    agent_webhook_listener.start()
+
+
+def before_all(context):
+    # The scenarios that will run, in order, so the device session for the next one can be started ahead of time
+    context.scenarios_to_run = [
+        scenario for feature in context._runner.features for scenario in feature.walk_scenarios() if scenario.should_run(context.config)
+    ]
+
+    # Start browsers for the web driven agents ahead of time, when asked for
+    browser_pool.prewarm(config('BROWSER_POOL_PREWARM', default=0, cast=int))
+
+    # The issuer and verifier interfaces are kept for the whole run. They are created the first time a step uses them,
+    # or in the background now with AGENT_INTERFACE_PREWARM, a role no selected scenario uses is then still built
+    issuer_info = context.config.userdata.get("Issuer").split(";")
+    verifier_info = context.config.userdata.get("Verifier").split(";")
+    prewarm = config('AGENT_INTERFACE_PREWARM', default=False, cast=bool)
+    context.issuer = RunScopedAgentInterface(
+        "issuer", lambda: _create_agent_interface("issuer", issuer_info[0], issuer_info[1]), prewarm
+    )
+    context.verifier = RunScopedAgentInterface(
+        "verifier", lambda: _create_agent_interface("verifier", verifier_info[0], verifier_info[1]), prewarm
+    )
+
+    # Create every schema and cred def the selected scenarios need up front, concurrently and before any
+    # device session is started, so the scenarios themselves only have to send credential offers.
+    issuer_class = AgentInterfaceFactory.issuer_agent_type_interface_dict.get(issuer_info[0])
+    if not hasattr(issuer_class, 'provision_credential_definitions'):
+        return
+    needed = credential_definitions_needed(
+        context._runner.features, context.config, os.path.join(os.path.dirname(__file__), "data")
+    )
+    if not needed:
+        return
+    print(f"Pre-provisioning {len(needed)} schema/credential definition combinations on the issuer")
+    try:
+        context.issuer.provision_credential_definitions(needed)
+    except Exception as e:
+        # Not fatal, scenarios will create what they need when they send the credential
+        print(f"Pre-provisioning schemas and credential definitions failed: {e}")
+
+
+def _create_agent_interface(role, agent_type, agent_endpoint):
+    """create the issuer or verifier interface from the agent factory and hook it up to the webhook listener and QR code uploads"""
+    aif = AgentInterfaceFactory()
+    if role == "issuer":
+        agent_interface = aif.create_issuer_agent_interface(agent_type, agent_endpoint)
+    else:
+        agent_interface = aif.create_verifier_agent_interface(agent_type, agent_endpoint)
+    if agent_webhook_listener.is_running() and hasattr(agent_interface, 'register_webhook_listener'):
+        webhook_url = agent_interface.register_webhook_listener(role)
+        print(f"Webhook listener url for the {role}: {webhook_url}")
+    if config('PREUPLOAD_QR_CODES', default=True, cast=bool) and hasattr(agent_interface, 'add_invitation_ready_listener'):
+        agent_interface.add_invitation_ready_listener(
+            lambda invitation_json, qrimage: device_service_handler.preupload_qrcode_async(qrimage)
+        )
+    return agent_interface
+
 
 def before_feature(context, feature):
     # TODO there is an issue where calling driver.reset does not reset the app on iOS. Until a solution is found for this issue
@@ -40,19 +112,12 @@ def before_feature(context, feature):
     # Add the Device handler to the test context so tests can do device specific calls. 
     context.device_service_handler = device_service_handler
 
-    # Get the issuer endpoint and the issuer type and create an issuer interface from the agent factory
-    issuer_info = context.config.userdata.get("Issuer").split(";")
-    issuer_type = issuer_info[0]
-    issuer_endpoint = issuer_info[1]
-    verifier_info = context.config.userdata.get("Verifier").split(";")
-    verifier_type = verifier_info[0]
-    verifier_endpoint = verifier_info[1]
-    aif = AgentInterfaceFactory()
-    context.issuer = aif.create_issuer_agent_interface(issuer_type, issuer_endpoint)
-    context.verifier = aif.create_verifier_agent_interface(verifier_type, verifier_endpoint)
+    # The issuer and verifier are kept from the last feature, put them back on their first page or create them again if they broke
+    context.issuer.check_between_features()
+    context.verifier.check_between_features()
     context.print_page_source_on_failure = eval(context.config.userdata['print_page_source_on_failure'])
     context.print_qr_code_on_creation = eval(context.config.userdata['print_qr_code_on_creation'])
-    context.save_qr_code_on_creation = True if device_cloud_service == 'LocalAndroid' or device_cloud_service == 'LambdaTest' else eval(context.config.userdata['save_qr_code_on_creation'])
+    context.save_qr_code_on_creation = eval(context.config.userdata['save_qr_code_on_creation'])
 
     # retry failed tests 
     try: 
@@ -77,12 +142,30 @@ def before_scenario(context, scenario):
     }
     device_service_handler.set_desired_capabilities(extra_desired_capabilities)
 
-    context.driver = device_service_handler.initialize_driver()
+    # Reuses the last scenario's session when APPIUM_SESSION_POOL is on and the capabilities did not change
+    context.driver = device_service_handler.acquire_driver()
 
     print("\nActual Capabilities used by Appium:")
     print(json.dumps(context.driver.capabilities,indent=4))
 
 
+def before_step(context, step):
+    # Start the next scenario's session while the last step of this one runs, if the device service allows a second
+    # session. Starting it any earlier would leave it idle long enough for Appium or the device service to end it.
+    if step is not list(context.scenario.all_steps)[-1]:
+        return
+    next_scenario = _next_scenario(context, context.scenario)
+    device_service_handler.prepare_next_driver(None if next_scenario is None else {'name': next_scenario.name})
+
+
+def _next_scenario(context, scenario):
+    scenarios = getattr(context, 'scenarios_to_run', [])
+    for (position, planned) in enumerate(scenarios):
+        if planned is scenario:
+            return scenarios[position + 1] if position + 1 < len(scenarios) else None
+    return None
+
+
 def after_scenario(context, scenario):
 
     if hasattr(context, 'driver') and scenario.status == Status.failed and context.print_page_source_on_failure:
@@ -126,8 +209,28 @@ def after_scenario(context, scenario):
         # else:
         #     context.driver.reset()
 
+    if scenario_queue is not None:
+        scenario_queue.report(str(scenario.location), config('SCENARIO_QUEUE_WORKER', default=socket.gethostname()), scenario.status.name, scenario.duration)
+
     if hasattr(context, 'driver'):
-        context.driver.quit()
+        # A failed scenario may have left the app or device in a bad state, don't hand its session to the next one
+        device_service_handler.release_driver(context.driver, reusable=scenario.status != Status.failed)
+
+def after_all(context):
+    for agent_interface in (context.issuer, context.verifier):
+        print(agent_interface.report())
+        agent_interface.close()
+    browser_pool.close()
+    print(browser_pool.report())
+    device_service_handler.close_session_pool()
+    print(device_service_handler.session_pool_report())
+    # Report how many QR code image uploads the device service's media cache saved
+    if hasattr(device_service_handler, 'media_cache_report'):
+        print(device_service_handler.media_cache_report())
+    # Report how much agent latency the GET cache saved over the run
+    print(agent_controller_cache.report())
+    # Report where the run still spent time in unconditional sleeps
+    print(sleep_audit.report())
 
 # def after_feature(context, feature):
 #     # Invoke driver.quit() after the test is done to indicate to BrowserStack 
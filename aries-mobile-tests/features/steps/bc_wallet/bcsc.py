@@ -74,6 +74,7 @@ def step_impl(context):
     #assert context.holderGetInviteInterface.open_invitation_email()
     #assert context.holderGetInviteInterface.select_invitation_link()
     qrcode =  context.holderGetInviteInterface.get_qr_code_invitation()
+    context.holderGetInviteInterface.close()
     context.device_service_handler.inject_qrcode(qrcode)
 
 #@then('they Close and go to Wallet')
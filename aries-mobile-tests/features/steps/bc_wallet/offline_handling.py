@@ -6,7 +6,6 @@
 from behave import given, when, then
 import json
 import os
-from time import sleep
 
 # Local Imports
 from agent_controller_client import agent_controller_GET, agent_controller_POST, expected_agent_state, setup_already_connected
@@ -123,8 +122,7 @@ def step_impl(context, no_internet_connection_msg):
     # Close the notification by clicking on it
     context.thisNoInternetNotification.dismiss_notification()
     # Check to make sure the notification is gone
-    sleep(5)
-    assert context.thisNoInternetNotification.on_this_page() == False
+    assert context.thisNoInternetNotification.wait_for_dismissed()
 
 
 @given('the holder is {using_the_app}')
@@ -6,11 +6,10 @@
 import logging
 from behave import given, when, then
 import json
-from time import sleep
 
 # Local Imports
 from agent_controller_client import agent_controller_GET, agent_controller_POST, expected_agent_state, setup_already_connected
-from agent_test_utils import get_qr_code_from_invitation, table_to_str, create_non_revoke_interval
+from agent_test_utils import get_qr_code_from_invitation, table_to_str, create_non_revoke_interval, wait_until
 # import Page Objects needed
 # from pageobjects.bc_wallet.credential_offer_notification import CredentialOfferNotificationPage
 from pageobjects.bc_wallet.information_sent_successfully import InformationSentSuccessfullyPage
@@ -21,6 +20,7 @@ from pageobjects.bc_wallet.navbar import NavBar
 from pageobjects.bc_wallet.camera_privacy_policy import CameraPrivacyPolicyPage
 from pageobjects.bc_wallet.credentials import CredentialsPage
 from pageobjects.bc_wallet.scan import ScanPage
+from pageobjects.screen_classifier import classify_current_screen
 
 
 @given('the holder has a Non-Revocable credential')
@@ -72,9 +72,8 @@ def step_impl(context, credential):
     if hasattr(context, 'thisCredentialsPage') == False:
         context.thisCredentialsPage = CredentialsPage(context.driver)
     if context.thisCredentialsPage.on_this_page():
-        # sleep a little bit to wait for a notification
-        sleep(5)
-        if context.thisNavBar.has_notification():
+        # give the notification a little while to come in, without waiting the whole time once it has
+        if wait_until(context.thisNavBar.has_notification, timeout=5):
             context.thisHomePage = context.thisNavBar.select_home()
             context.thisCredentialOfferPage = context.thisHomePage.select_credential_offer_notification()
 
@@ -427,9 +426,10 @@ def step_impl(context):
     # If this is the first time the user selects scan, then they will get a Camera Privacy Policy that needs to be dismissed
     # if autoGrantPermissions is in Capabilities = True, and platform is Android, skip this
     if ('autoGrantPermissions' in context.driver.capabilities and context.driver.capabilities['autoGrantPermissions'] == False) or (context.driver.capabilities['platformName'] == 'iOS'):
-        context.thisCameraPrivacyPolicyPage = CameraPrivacyPolicyPage(
-            context.driver)
-        if context.thisCameraPrivacyPolicyPage.on_this_page():
+        # Wait for whichever screen the scan leads to instead of a full timeout when the policy is not shown
+        current_screen = classify_current_screen(context.driver, [CameraPrivacyPolicyPage, ScanPage, ProofRequestPage], timeout=20)
+        if isinstance(current_screen, CameraPrivacyPolicyPage):
+            context.thisCameraPrivacyPolicyPage = current_screen
             context.thisCameraPrivacyPolicyPage.select_allow()
     
     # It is possible that the QR code scan page could have an error displayed like invalid QR code, or at times displays
@@ -437,8 +437,8 @@ def step_impl(context):
     # close the scan window and scan again.
     if hasattr(context, 'thisQRCodeScanPage') == False:
         context.thisQRCodeScanPage = ScanPage(context.driver)
-    if context.thisQRCodeScanPage.on_this_page():
-        sleep(5)
+    # Wait for the scan to go through or fail instead of a fixed pause, and only close and scan again if it did not go through
+    if context.thisQRCodeScanPage.on_this_page() and not context.thisQRCodeScanPage.wait_for_scan():
         if "Invalid QR code" in context.thisQRCodeScanPage.get_page_source():
             # log the issue and close the scan window and scan again
             logging.info("Invalid QR code error on scan page, closing and scanning again")
@@ -509,8 +509,9 @@ def step_impl(context):
 
 @then(u'the holder reviews the contents of the revocation notification message')
 def step_impl(context):
-    assert context.table[0]["credential_name"] in context.driver.page_source
-    assert context.table[0]["revoked_message"] in context.driver.page_source
+    page_source = context.thisCredentialDetailsPage.get_page_source()
+    assert context.table[0]["credential_name"] in page_source
+    assert context.table[0]["revoked_message"] in page_source
 
 
 @then(u'acknowledges the revocation notification')
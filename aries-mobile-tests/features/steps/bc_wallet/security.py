@@ -83,11 +83,8 @@ def step_impl(context):
     # The Home page will not show until the initialization page is done. 
     #assert context.thisInitializationPage.on_this_page()
     context.thisHomePage = context.thisInitializationPage.wait_until_initialized()
-    if context.thisHomePage.welcome_to_bc_wallet_modal.is_displayed():
-        context.thisHomePage.welcome_to_bc_wallet_modal.select_dismiss()
-        assert True
-    else:
-        assert context.thisHomePage.on_this_page()
+    # The Welcome to BC Wallet modal, if it shows up, is dismissed by the modal watcher
+    assert context.thisHomePage.on_this_page()
 
 @then('they land on the Home screen')
 @when('initialization ends (failing silently)')
@@ -96,8 +93,7 @@ def step_impl(context):
     #assert context.thisInitializationPage.on_this_page()
     context.thisHomePage = context.thisInitializationPage.wait_until_initialized()
     context.thisNavBar = NavBar(context.driver)
-    if context.thisHomePage.welcome_to_bc_wallet_modal.is_displayed():
-        context.thisHomePage.welcome_to_bc_wallet_modal.select_dismiss()
+    context.thisHomePage.check_for_modals()
     assert context.thisHomePage.on_this_page()
 
     # set the environment to TEST instead of PROD which is default as of build 575
@@ -123,8 +119,7 @@ def step_impl(context, env):
     context.thisDeveloperSettingsPage.select_env(env)
     context.thisSettingsPage = context.thisDeveloperSettingsPage.select_back()
     context.thisSettingsPage.select_back()
-    if context.thisHomePage.welcome_to_bc_wallet_modal.is_displayed():
-        context.thisHomePage.welcome_to_bc_wallet_modal.select_dismiss()
+    context.thisHomePage.check_for_modals()
     assert context.thisHomePage.on_this_page()
 
 
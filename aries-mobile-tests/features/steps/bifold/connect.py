@@ -4,7 +4,6 @@
 # -----------------------------------------------------------
 
 import logging
-from time import sleep
 from pageobjects.bc_wallet.scan import ScanPage
 from behave import given, when, then
 import json
@@ -47,8 +46,8 @@ def step_impl(context):
     # close the scan window and scan again.
     if hasattr(context, 'thisQRCodeScanPage') == False:
         context.thisQRCodeScanPage = ScanPage(context.driver)
-    if context.thisQRCodeScanPage.on_this_page():
-        sleep(5)
+    # Wait for the scan to go through or fail instead of a fixed pause, and only close and scan again if it did not go through
+    if context.thisQRCodeScanPage.on_this_page() and not context.thisQRCodeScanPage.wait_for_scan():
         if "Invalid QR code" in context.thisQRCodeScanPage.get_page_source():
             # log the issue and close the scan window and scan again
             logging.info("Invalid QR code error on scan page, closing and scanning again")
@@ -6,6 +6,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 import xml.etree.ElementTree as ET
+from pageobjects.page_source_snapshot import PageSourceSnapshot
+from pageobjects.hierarchy_index import HierarchyIndex
+from pageobjects.modal_watcher import ModalWatcher
+from sleep_audit import poll_sleep
 
 class WaitCondition(Enum):
     ELEMENT_TO_BE_CLICKABLE = EC.element_to_be_clickable
@@ -13,15 +17,31 @@ class WaitCondition(Enum):
     VISIBILITY_OF_ELEMENT_LOCATED = EC.visibility_of_element_located
     INVISIBILITY_OF_ELEMENT_LOCATED = EC.invisibility_of_element_located
 
+def not_displayed(locator_tpl: tuple):
+    """wait_for_any condition that is met once no element matching locator is shown"""
+    def condition(page_source, index):
+        # iOS, and newer Android drivers, keep hidden elements in the page source flagged as not visible
+        return all(
+            element.get_attribute("visible") == "false" or element.get_attribute("displayed") == "false"
+            for element in index.find_all(locator_tpl)
+        )
+    return condition
+
 # BasePage to do common setup and functions
 class BasePage(object):
     """A base page object to do things common to all page objects"""
 
+    # (modal page class, handler(modal)) pairs for modals that can pop up over this page, see pageobjects.modal_watcher
+    interruptive_modals = []
+
     def back(self, context):
         pass
 
     def set_device(self, context):
         self.driver = context.driver
+        self.page_source_snapshot = PageSourceSnapshot.for_driver(context.driver)
+        self.modal_watcher = ModalWatcher.for_driver(context.driver)
+        self.modal_watcher.register_page(type(self))
 
     def on_this_page(self, locator, timeout=10):
         if type(locator) is tuple:
@@ -35,23 +55,28 @@ class BasePage(object):
             # else:
             #     return False
         else:
-            found_locator = False
-            i = 0
-            while found_locator == False and i < timeout:
-                if locator in self.get_page_source():
-                    found_locator = True
-                else:
-                    found_locator = False
-                i = i + 1
-            return found_locator
+            # timeout is in seconds
+            return self.wait_for_page_source(lambda page_source: locator in page_source, timeout)
 
     # Initialize and define the type of driver as WebDriver
 
     def __init__(self, driver):
         self.driver = driver
         self.current_platform = driver.capabilities['platformName']
+        self.page_source_snapshot = PageSourceSnapshot.for_driver(driver)
+        self.modal_watcher = ModalWatcher.for_driver(driver)
+        self.modal_watcher.register_page(type(self))
 
     def find_by(self, locator_tpl: tuple, timeout=20, wait_condition:WaitCondition=WaitCondition.PRESENCE_OF_ELEMENT_LOCATED):
+        try:
+            return self._find_by(locator_tpl, timeout, wait_condition)
+        except:
+            # A known modal covering the screen is handled and the find tried once more
+            if self.check_for_modals():
+                return self._find_by(locator_tpl, timeout, wait_condition)
+            raise
+
+    def _find_by(self, locator_tpl: tuple, timeout=20, wait_condition:WaitCondition=WaitCondition.PRESENCE_OF_ELEMENT_LOCATED):
         if locator_tpl[0] == AppiumBy.ACCESSIBILITY_ID:
             return self.find_by_accessibility_id(locator_tpl[1], timeout, wait_condition)
         elif locator_tpl[0] == AppiumBy.ID:
@@ -138,8 +163,99 @@ class BasePage(object):
             raise Exception(
                 f"Could not find element by element id Locator {locator}")
 
-    def get_page_source(self):
-        return self.driver.page_source
+    def get_page_source(self, refresh=False):
+        """return the page source, reusing the snapshot taken since the last driver action if there is one"""
+        with self.modal_watcher.watching(type(self)):
+            return self.page_source_snapshot.get(refresh)
+
+    def wait_for_page_source(self, predicate, timeout=10, initial_interval=0.25, max_interval=2.0, backoff=2.0):
+        """poll the page source until predicate(page_source) is true or timeout seconds pass, backing off between polls"""
+        return self._poll(lambda refresh: predicate(self.get_page_source(refresh)), timeout, initial_interval, max_interval, backoff)
+
+    def _poll(self, check, timeout, initial_interval=0.25, max_interval=2.0, backoff=2.0):
+        """call check(refresh) until it returns something truthy or timeout seconds pass, return its last result"""
+        deadline = time.monotonic() + timeout
+        interval = initial_interval
+        # The first check can use the current snapshot, later ones need to see the screen change
+        refresh = False
+        with self.modal_watcher.watching(type(self)):
+            while True:
+                result = check(refresh)
+                if result:
+                    return result
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return result
+                poll_sleep(min(interval, remaining))
+                interval = min(interval * backoff, max_interval)
+                refresh = True
+
+    def check_for_modals(self) -> bool:
+        """handle any modal this page declared that is on the screen now, without waiting for one. Returns True if one was handled"""
+        with self.modal_watcher.watching(type(self)):
+            return self.modal_watcher.check()
+
+    def get_hierarchy_index(self, refresh=False) -> HierarchyIndex:
+        """return the index of the current page source snapshot for read only queries"""
+        with self.modal_watcher.watching(type(self)):
+            return self.page_source_snapshot.get_index(self.current_platform, refresh)
+
+    def find_in_hierarchy(self, locator_tpl: tuple, timeout=20) -> list:
+        """return the page source elements matching locator, waiting up to timeout seconds for at least one. Use find_by to interact with them"""
+        return self._poll(lambda refresh: self.get_hierarchy_index(refresh).find_all(locator_tpl), timeout)
+
+    def classify_current_screen(self, candidates=None, timeout=0):
+        """return a page object for the screen the app is on, see pageobjects.screen_classifier"""
+        # imported here as the classifier imports every page object, which all import this module
+        from pageobjects.screen_classifier import classify_current_screen
+        return classify_current_screen(self.driver, candidates, timeout)
+
+    def wait_for_any(self, conditions: list, timeout=20):
+        """
+        poll all conditions against the same page source until one is met and return it, None if none are met within timeout seconds.
+        A condition is a locator tuple or a page text that should be present, a page object or page object class whose
+        screen fingerprint should match, or a function (page_source, hierarchy_index) -> bool like not_displayed().
+        Conditions earlier in the list win when more than one is met in the same poll.
+        """
+        from pageobjects.screen_classifier import ScreenFingerprint, fingerprint_locators
+
+        def is_met(condition, page_source, index):
+            if isinstance(condition, BasePage) or (isinstance(condition, type) and issubclass(condition, BasePage)):
+                page_class = condition if isinstance(condition, type) else type(condition)
+                return ScreenFingerprint(page_class, fingerprint_locators(page_class)).match(page_source, index) > 0
+            if callable(condition):
+                return condition(page_source, index)
+            if type(condition) is tuple:
+                if index.can_resolve(condition):
+                    return index.exists(condition)
+                return len(self.driver.find_elements(*condition)) > 0
+            return condition in page_source
+
+        def first_met(refresh):
+            page_source = self.get_page_source(refresh)
+            index = self.get_hierarchy_index()
+            for condition in conditions:
+                if is_met(condition, page_source, index):
+                    # wrapped so a met condition that is falsy, like an empty string, still ends the wait
+                    return [condition]
+            return None
+
+        met = self._poll(first_met, timeout)
+        return met[0] if met else None
+
+    def get_texts(self, locator_tpl: tuple, timeout=20, include_children=False) -> list:
+        """return the text of every element matching locator in one call, include_children is for containers like cards"""
+        if self.get_hierarchy_index().can_resolve(locator_tpl):
+            elements = self.find_in_hierarchy(locator_tpl, timeout)
+            if include_children:
+                return [element.text_content for element in elements]
+            return [element.text for element in elements]
+        # Locators the index can not resolve cost a round trip per element
+        return [element.text for element in self.find_multiple_by(locator_tpl, timeout)]
+
+    def get_attributes(self, locator_tpl: tuple, name, timeout=20) -> list:
+        """return the page source attribute name of every element matching locator in one call"""
+        return [element.get_attribute(name) for element in self.find_in_hierarchy(locator_tpl, timeout)]
 
     # Positioning according to xpath
     def find_by_xpath(self, locator):
@@ -193,7 +309,7 @@ class BasePage(object):
         screen_size = self.driver.get_window_size()
         screen_height = screen_size['height']
 
-        before_source_ios = self.driver.page_source
+        before_source_ios = self.get_page_source()
 
         # Scroll down the page until the bottom is reached
         while True:
@@ -210,7 +326,7 @@ class BasePage(object):
 
             # Get the current scroll position
             if self.current_platform == 'iOS':
-                after_source_ios = self.driver.page_source
+                after_source_ios = self.get_page_source()
                 # Parse the hierarchies using an XML parser
                 after_root = ET.fromstring(after_source_ios.encode('utf-8'))
 
@@ -236,13 +352,13 @@ class BasePage(object):
     def scroll_to_top(self):
         # Get the initial page source
         if self.current_platform == 'iOS':
-            before_source_ios = self.driver.page_source
+            before_source_ios = self.get_page_source()
 
         # Scroll up the page until the top is reached
         while True:
             if self.current_platform == 'iOS':
                 self.driver.execute_script('mobile: scroll', {'direction': 'up'})
-                after_source_ios = self.driver.page_source
+                after_source_ios = self.get_page_source()
                 # Parse the hierarchies using an XML parser
                 before_root = ET.fromstring(before_source_ios.encode('utf-8'))
                 after_root = ET.fromstring(after_source_ios.encode('utf-8'))
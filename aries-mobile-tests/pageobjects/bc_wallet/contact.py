@@ -23,6 +23,7 @@ class ContactPage(BasePage):
     proof_request_message_locator = (AppiumBy.XPATH, '//*[contains(@name, "sent a proof request") or contains(@text, "sent a proof request")]')
     open_credential_offer_locator = (AppiumBy.ID, "com.ariesbifold:id/Viewoffer")
     open_proof_request_locator = (AppiumBy.ID, "com.ariesbifold:id/Viewrequest")
+    screen_fingerprint = (chat_box_locator,)
 
     def on_this_page(self):     
         return super().on_this_page(self.contact_locator) 
@@ -28,7 +28,7 @@ class ContactRemoveFromWalletPage(BasePage):
 
     def get_details_text(self) -> str:
         if self.on_this_page():
-            return self.driver.page_source
+            return self.get_page_source()
         else:
             raise Exception(f"App not on the {type(self)}")
 
@@ -33,7 +33,7 @@ class ContactsPage(BasePage):
 
     def is_contact_present(self, name) -> bool:
         if self.on_this_page():
-            if name in self.driver.page_source:
+            if name in self.get_page_source():
                 return True
             else:
                 return False
@@ -21,6 +21,7 @@ class CredentialOfferPage(BasePage):
     accept_aid_locator = (AppiumBy.ACCESSIBILITY_ID, "Accept")
     decline_locator = (AppiumBy.ID, "com.ariesbifold:id/DeclineCredentialOffer")
     decline_aid_locator = (AppiumBy.ACCESSIBILITY_ID, "Decline")
+    screen_fingerprint = (accept_locator, on_this_page_text_locator)
 
     def on_this_page(self):
         #return super().on_this_page(self.on_this_page_text_locator, 30)
@@ -59,16 +60,12 @@ class CredentialOfferPage(BasePage):
 
     def get_credential_details(self):
         if self.on_this_page():
-            who = self.find_by_accessibility_id(self.who_locator).text
-            cred_type = self.find_by_accessibility_id(self.cred_type_locator).text
-            attribute_elements = self.find_multiple_by_id(self.attribute_locator)
-            value_elements = self.find_multiple_by_id(self.values_locator)
-            attributes = []
-            for attribute in attribute_elements:
-                attributes.append(attribute.text)
-            values = []
-            for value in value_elements:
-                values.append(value.text)
+            # Read everything from one page source instead of a driver call per element and per text
+            index = self.get_hierarchy_index()
+            who = index.get_text((AppiumBy.ACCESSIBILITY_ID, self.who_locator))
+            cred_type = index.get_text((AppiumBy.ACCESSIBILITY_ID, self.cred_type_locator))
+            attributes = self.get_texts((AppiumBy.ID, self.attribute_locator))
+            values = self.get_texts((AppiumBy.ID, self.value_locator))
             return who, cred_type, attributes, values
         else:
             raise Exception(f"App not on the {type(self)} page")
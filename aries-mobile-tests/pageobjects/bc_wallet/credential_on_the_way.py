@@ -4,6 +4,7 @@ from pageobjects.bc_wallet.credential_added import CredentialAddedPage
 import logging
 from selenium.common.exceptions import TimeoutException
 from pageobjects.basepage import WaitCondition
+from pageobjects.basepage import not_displayed
 
 
 # These classes can inherit from a BasePage to do common setup and functions
@@ -34,20 +35,16 @@ class CredentialOnTheWayPage(BasePage):
 
     def wait_for_credential(self, timeout=120):
 
-        # Wait for the Credential On the way indicator to disappear
-        try:
-            # Make sure the unable to accept credential offer modal is not displayed
-            if not self.unable_to_accept_credential_offer_modal.is_displayed():
-                self.find_by(self.on_this_page_locator, timeout, WaitCondition.INVISIBILITY_OF_ELEMENT_LOCATED)
-                logging.debug("Credential On the way indicator disappeared")
-            else:
-                self.raise_exception_unable_to_accept_credential_offer()
-        except TimeoutException:
+        # Wait for the Credential On the way indicator to disappear, or the unable to accept credential offer modal to show up
+        settled_on = self.wait_for_any(
+            [self.unable_to_accept_credential_offer_modal, not_displayed(self.on_this_page_locator)], timeout
+        )
+        if settled_on is self.unable_to_accept_credential_offer_modal:
+            self.raise_exception_unable_to_accept_credential_offer()
+        elif settled_on is None:
             logging.error(f"Getting Credential taking longer than expected. Timing out at {timeout} seconds.")
-            # Check if the unable to accept credential offer modal is displayed
-            if self.unable_to_accept_credential_offer_modal.is_displayed():
-                self.raise_exception_unable_to_accept_credential_offer()
-            raise
+            raise TimeoutException(f"Credential On the way indicator still displayed after {timeout} seconds")
+        logging.debug("Credential On the way indicator disappeared")
 
         # Return the HomePage object
         return CredentialAddedPage(self.driver)
@@ -36,15 +36,12 @@ class CredentialsPage(BasePage):
     def get_credentials(self):
         if self.on_this_page():
             if self.current_platform == "iOS":
-                elems = self.find_multiple_by(self.credential_card_header_locator)
+                texts = self.get_texts(self.credential_card_header_locator, include_children=True)
             else:
-                elems = self.find_multiple_by(self.credential_name_locator)
+                texts = self.get_texts(self.credential_name_locator)
             json_elems = {
-                "credentials": [
-                ],
+                "credentials": [{"text": text} for text in texts],
             }
-            for elem in elems:
-                json_elems["credentials"].append({"text":elem.text})
             return json_elems
         else:
             raise Exception(f"App not on the {type(self)} page")
@@ -64,4 +61,4 @@ class CredentialsPage(BasePage):
             raise Exception(f"App not on the {type(self)} page")
 
     def credential_exists(self, cred_name):
-        return cred_name in self.driver.page_source
\ No newline at end of file
+        return cred_name in self.get_page_source()
\ No newline at end of file
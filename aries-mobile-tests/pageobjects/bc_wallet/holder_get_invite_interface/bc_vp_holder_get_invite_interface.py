@@ -1,13 +1,8 @@
 """
 Class for interfacing with gmail client getting a IDIM Verified Person Credential certificate invitation
 """
-from sys import platform
+from browser_pool import browser_pool
 from decouple import config
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
 # import Page Objects needed
 from pageobjects.bc_wallet.holder_get_invite_interface.pageobjects.gmail_login_page import GmailLoginPage
 from pageobjects.bc_wallet.holder_get_invite_interface.pageobjects.gmail_email_page import GmailEmailPage
@@ -30,18 +25,7 @@ class BCVPHolderGetInviteInterface():
     def __init__(self, endpoint):
         # Standup Selenuim Driver with endpoint
         self.endpoint = endpoint
-        if platform == "linux" or platform == "linux2":
-            print("Starting Chromium on linux for Issuer Agent")
-            options = Options()
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--headless")
-            self.driver = webdriver.Chrome(options=options, service=Service(
-                ChromeDriverManager(chrome_type=ChromeType.CHROMIUM).install()))
-        else:
-            print("Starting Chrome on Mac or Windows for Issuer Agent")
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()))
+        self.driver = browser_pool.lease()
         # go to the issuer endpoint in the browser
         self.driver.get(self.endpoint)
         # instantiate intial page objects
@@ -87,6 +71,10 @@ class BCVPHolderGetInviteInterface():
         self._bc_vc_qrcode_page = self._bc_vc_invitation_review_page.proceed()
         return self._bc_vc_qrcode_page.get_qr_code()
 
+    def close(self):
+        """give the browser back to the browser pool"""
+        browser_pool.release(self.driver)
+
     def _login(self, username: str, password: str):
         if not self._gmail_login_page.on_this_page():
             raise Exception(
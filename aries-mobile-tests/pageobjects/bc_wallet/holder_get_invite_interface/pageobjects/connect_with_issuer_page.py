@@ -1,7 +1,7 @@
 from PIL import Image
 from agent_factory.candy_uvp.pageobjects.webbasepage import WebBasePage
 from selenium.webdriver.common.by import By
-import base64
+from agent_test_utils import QRCodeImage
 #from candy_uvp.pageobjects.connect_with_issuer_page import ConnectWithIssuerPage
 
 # These classes can inherit from a BasePage to do commone setup and functions
@@ -18,11 +18,8 @@ class ConnectWithIssuerPage(WebBasePage):
 
     def get_qr_code(self):
         if self.on_this_page():
-            qrcode_element = self.find_by(self.qr_code_locator)
-            self.driver.save_screenshot("qrcode.png")
-            #qrcode = Image.open("qrcode.png")
-            qrcode = base64.b64encode(open("qrcode.png", "rb").read())
-            return qrcode.decode('utf-8')
+            qrcode_element = self.wait_for_qr_code(self.qr_code_locator)
+            return QRCodeImage(self.driver.get_screenshot_as_png())
             
         else:
             raise Exception(f"App not on the {type(self)} page")
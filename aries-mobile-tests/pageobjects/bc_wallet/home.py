@@ -9,7 +9,6 @@ from pageobjects.bc_wallet.get_person_credential import GetPersonCredentialPage
 from pageobjects.bc_wallet.credential_details import CredentialDetailsPage
 from pageobjects.bc_wallet.welcome_to_bc_wallet import WelcomeToBCWalletModal
 from pageobjects.bc_wallet.feedback import FeedbackPage
-from time import sleep
 
 
 class HomePage(BasePage):
@@ -35,6 +34,7 @@ class HomePage(BasePage):
 
     # Modals and Alerts for Home page
     welcome_to_bc_wallet_modal = WelcomeToBCWalletModal
+    interruptive_modals = [(WelcomeToBCWalletModal, WelcomeToBCWalletModal.select_dismiss)]
     
     def __init__(self, driver):
         super().__init__(driver)
@@ -83,10 +83,10 @@ class HomePage(BasePage):
 
     def select_proof_request_notification(self):
         if super().on_this_page(self.on_this_page_proof_notification_locator):
-            sleep(20)
             #print(self.driver.page_source)
             # if self.current_platform == "iOS":
-            self.find_by(self.view_notification_button_locator).click()
+            # wait for the notification to settle and become tappable instead of a fixed pause
+            self.find_by(self.view_notification_button_locator, timeout=20, wait_condition=WaitCondition.ELEMENT_TO_BE_CLICKABLE).click()
             #self.find_by_accessibility_id(self.view_notification_button_locator).click()
             # else:
             #     self.find_by_element_id(self.view_notification_button_locator).click()
@@ -7,6 +7,56 @@ from pageobjects.basepage import WaitCondition
 import time
 
 
+class OopsSomethingWentWrongModal(BasePage):
+    """Oops! Something went wrong Modal page object"""
+
+    # Locators
+    on_this_page_text_locator = "Oops! Something went wrong"
+    error_title_locator = (AppiumBy.ID, "com.ariesbifold:id/HeaderText")
+    main_error_locator = (AppiumBy.ID, "com.ariesbifold:id/BodyText")
+    show_details_locator = (AppiumBy.ID, "com.ariesbifold:id/ShowDetails")
+    detailed_error_locator = (AppiumBy.ID, "com.ariesbifold:id/BodyText")
+    retry_locator = (AppiumBy.ID, "com.ariesbifold:id/Retry")
+
+    def on_this_page(self):
+        return super().on_this_page(self.on_this_page_text_locator)
+        #return super().on_this_page(self.error_title_locator)
+        
+    def is_displayed(self):
+        return self.on_this_page()
+    
+    def is_timeout_error(self):
+        return "Timeout" in self.get_main_error()
+
+    def get_error_title(self) -> str:
+        return self.find_by(self.error_title_locator).text
+
+    def get_main_error(self) -> str:
+        return self.find_by(self.main_error_locator).text
+        
+    def select_show_details(self):
+        self.find_by(self.show_details_locator, wait_condition=WaitCondition.ELEMENT_TO_BE_CLICKABLE).click()
+
+    def get_detailed_error(self) -> str:
+        return self.find_by(self.detailed_error_locator).text
+
+    def raise_error(self):
+        """escalate the modal as an exception with the error it shows"""
+        error_title = self.get_error_title()
+        main_error = self.get_main_error()
+        # if Timeout error, then raise exception
+        if self.is_timeout_error():
+            raise Exception(f"{error_title}\n{main_error}")
+        else:
+            # Otherwise, Show details, and get the details message and raise exception
+            self.select_show_details()
+            detailed_error = self.get_detailed_error()
+            raise Exception(f"{error_title}\n{main_error}\n{detailed_error}")
+
+    def select_retry(self):
+        self.find_by(self.retry_locator, wait_condition=WaitCondition.ELEMENT_TO_BE_CLICKABLE).click()
+
+
 # These classes can inherit from a BasePage to do common setup and functions
 class InitializationPage(BasePage):
     """Wallet initialization page that appears after setting up pin or entering pin"""
@@ -19,6 +69,8 @@ class InitializationPage(BasePage):
     error_details_link_locator = (AppiumBy.ID, "com.ariesbifold:id/ShowDetails") 
     error_details_locator = (AppiumBy.ID, "com.ariesbifold:id/DetailsText")
     error_okay_button_locator = (AppiumBy.ID, "com.ariesbifold:id/Okay")
+    screen_fingerprint = (loading_locator,)
+    interruptive_modals = [(OopsSomethingWentWrongModal, OopsSomethingWentWrongModal.raise_error)]
 
     def __init__(self, driver):
         super().__init__(driver)
@@ -29,19 +81,8 @@ class InitializationPage(BasePage):
         return self.still_initializing()
 
     def still_initializing(self):
-        # Check for something went wrong modal
-        if self.oops_something_went_wrong_modal.is_displayed():
-            # Get the main error
-            error_title = self.oops_something_went_wrong_modal.get_error_title()
-            main_error = self.oops_something_went_wrong_modal.get_main_error()
-            # if Timeout error, then raise exception
-            if self.oops_something_went_wrong_modal.is_timeout_error():
-                raise Exception(f"{error_title}\n{main_error}")
-            else:
-                # Otherwise, Show details, and get the details message and raise exception
-                self.oops_something_went_wrong_modal.select_show_details()
-                detailed_error = self.oops_something_went_wrong_modal.get_detailed_error()
-                raise Exception(f"{error_title}\n{main_error}\n{detailed_error}")
+        # The modal watcher raises the error if the something went wrong modal is displayed
+        self.check_for_modals()
         try:
             self.find_by(self.loading_locator)
             return True
@@ -77,40 +118,3 @@ class InitializationPage(BasePage):
                     raise
         from pageobjects.bc_wallet.home import HomePage
         return HomePage(self.driver)
-
-class OopsSomethingWentWrongModal(BasePage):
-    """Oops! Something went wrong Modal page object"""
-
-    # Locators
-    on_this_page_text_locator = "Oops! Something went wrong"
-    error_title_locator = (AppiumBy.ID, "com.ariesbifold:id/HeaderText")
-    main_error_locator = (AppiumBy.ID, "com.ariesbifold:id/BodyText")
-    show_details_locator = (AppiumBy.ID, "com.ariesbifold:id/ShowDetails")
-    detailed_error_locator = (AppiumBy.ID, "com.ariesbifold:id/BodyText")
-    retry_locator = (AppiumBy.ID, "com.ariesbifold:id/Retry")
-
-    def on_this_page(self):
-        return super().on_this_page(self.on_this_page_text_locator)
-        #return super().on_this_page(self.error_title_locator)
-        
-    def is_displayed(self):
-        return self.on_this_page()
-    
-    def is_timeout_error(self):
-        return "Timeout" in self.get_main_error()
-
-    def get_error_title(self) -> str:
-        return self.find_by(self.error_title_locator).text
-
-    def get_main_error(self) -> str:
-        return self.find_by(self.main_error_locator).text
-        
-    def select_show_details(self):
-        self.find_by(self.show_details_locator, wait_condition=WaitCondition.ELEMENT_TO_BE_CLICKABLE).click()
-
-    def get_detailed_error(self) -> str:
-        return self.find_by(self.detailed_error_locator).text
-
-    def select_retry(self):
-        self.find_by(self.retry_locator, wait_condition=WaitCondition.ELEMENT_TO_BE_CLICKABLE).click()
-
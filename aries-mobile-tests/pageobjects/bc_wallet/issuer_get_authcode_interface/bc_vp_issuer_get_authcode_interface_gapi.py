@@ -2,7 +2,8 @@
 Class for interfacing with gmail client getting a IDIM Verified Person Credential certificate invitation
 """
 from sys import platform
-from time import sleep
+import time
+from sleep_audit import poll_sleep
 from decouple import config
 import re
 import base64
@@ -61,21 +62,35 @@ class BCVPIssuerGetAuthCodeInterface():
                 f"Could not initialize gmail api service {error}")
 
 
-    def get_auth_code(self):
+    def get_auth_code(self, timeout=60, initial_interval=1.0, max_interval=8.0, backoff=2.0):
+        """poll the inbox until the GitHub verification email comes in, backing off between polls, and return its auth code"""
 
         # delete	DELETE /gmail/v1/users/{userId}/messages/{id}
         # Immediately and permanently deletes the specified message.
         # get	GET /gmail/v1/users/{userId}/messages/{id}
         # Gets the specified message.
 
+        # Check the messages until the verify email comes in instead of waiting a fixed time for it
+        deadline = time.monotonic() + timeout
+        interval = initial_interval
+        while True:
+            auth_code = self._find_auth_code()
+            if auth_code is not None:
+                return auth_code
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise Exception(f"The GitHub verification email did not arrive within {timeout} seconds")
+            poll_sleep(min(interval, remaining))
+            interval = min(interval * backoff, max_interval)
+
+    def _find_auth_code(self):
+        """return the auth code from the GitHub verification email in the inbox, None if it is not there yet"""
         # request a list of all the messages
-        # wait a few seconds to wait for the verify email to come in. Change this to loop messages again 
-        sleep(5)
         result = self._service.users().messages().list(userId='me').execute()
     
         # We can also pass maxResults to get any number of emails. Like this:
         # result = service.users().messages().list(maxResults=200, userId='me').execute()
-        messages = result.get('messages')
+        messages = result.get('messages') or []
     
         # messages is a list of dictionaries where each dictionary contains a message id.
     
@@ -117,3 +132,5 @@ class BCVPIssuerGetAuthCodeInterface():
 
             except:
                 raise
+
+        return None
@@ -24,6 +24,7 @@ class ProofRequestPage(BasePage):
     share_aid_locator = (AppiumBy.ACCESSIBILITY_ID, "Share")
     decline_locator = (AppiumBy.ID, "com.ariesbifold:id/Decline")
     credential_card_locator = (AppiumBy.ID, "com.ariesbifold:id/CredentialCard")
+    screen_fingerprint = (share_locator, on_this_page_text_locator)
 
 
     def on_this_page(self):
@@ -59,16 +60,10 @@ class ProofRequestPage(BasePage):
 
     def get_proof_request_details(self):
         if self.on_this_page():
-            who = self.find_by(self.who_locator).text
+            who = self.get_hierarchy_index().get_text(self.who_locator)
             #cred_type = self.find_by_accessibility_id(self.details_locator).text
-            attribute_elements = self.find_multiple_by(self.attribute_locator)
-            value_elements = self.find_multiple_by(self.value_locator)
-            attributes = []
-            for attribute in attribute_elements:
-                attributes.append(attribute.text)
-            values = []
-            for value in value_elements:
-                values.append(value.text)
+            attributes = self.get_texts(self.attribute_locator)
+            values = self.get_texts(self.value_locator)
             return who, attributes, values
         else:
             raise Exception(f"App not on the {type(self)} page")
@@ -82,12 +77,7 @@ class ProofRequestPage(BasePage):
         
     def get_text_in_all_credential_cards_in_proof_request(self) ->list:
         if self.on_this_page():
-            credential_card_elements = self.find_multiple_by(self.credential_card_locator)
-            # for each credential card, get the text and append to a list
-            credential_card_text_list = []
-            for credential_card in credential_card_elements:
-                credential_card_text_list.append(credential_card.text)
             # If the list is empty, there is no credential on the proof request screen
-            return credential_card_text_list
+            return self.get_texts(self.credential_card_locator, include_children=True)
         else:
-            raise Exception(f"App not on the {type(self)} page")
\ No newline at end of file
+            raise Exception(f"App not on the {type(self)} page")
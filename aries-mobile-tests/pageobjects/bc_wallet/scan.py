@@ -2,6 +2,7 @@ import logging
 from appium.webdriver.common.appiumby import AppiumBy
 from pageobjects.basepage import BasePage
 from pageobjects.basepage import WaitCondition
+from pageobjects.basepage import not_displayed
 
 
 # These classes can inherit from a BasePage to do common setup and functions
@@ -12,10 +13,17 @@ class ScanPage(BasePage):
     close_locator = (AppiumBy.ID, "com.ariesbifold:id/ScanClose")
     flash_locator = (AppiumBy.ID, "com.ariesbifold:id/ScanTorch")
     error_locator = (AppiumBy.ID, "com.ariesbifold:id/ErrorText")
+    invalid_qr_code_text = "Invalid QR code"
+    screen_fingerprint = (close_locator,)
 
     def on_this_page(self):
         return super().on_this_page(self.close_locator)
 
+    def wait_for_scan(self, timeout=5) -> bool:
+        """wait for the scan to take the app off this page, False if it shows an invalid QR code error or is still scanning after timeout"""
+        scanned = not_displayed(self.close_locator)
+        return self.wait_for_any([scanned, self.invalid_qr_code_text], timeout) is scanned
+
     def get_error(self) -> str:
         return self.find_by(self.error_locator).text
         
@@ -14,6 +14,10 @@ class ToastNotification(BasePage):
             timeout = 100
         return super().on_this_page(self.on_this_page_text_locator, timeout)  
 
+    def wait_for_dismissed(self, timeout=5) -> bool:
+        """wait for the notification to go away, True if it is gone within timeout seconds"""
+        return self.wait_for_page_source(lambda page_source: self.on_this_page_text_locator not in page_source, timeout)
+
     def dismiss_notification(self):
         if self.on_this_page():
             self.find_by(self.notification_locator).click()
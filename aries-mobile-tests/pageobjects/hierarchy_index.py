@@ -0,0 +1,109 @@
+"""
+Index over one parsed page source, so read only queries (does it exist, how many, what does it say)
+for many locators are answered in process instead of with one WebDriver round trip each.
+Interactions still need a real element from the driver.
+"""
+
+from appium.webdriver.common.appiumby import AppiumBy
+
+
+class HierarchyElement():
+    """read only view of one element in the page source"""
+
+    def __init__(self, node, platform):
+        self.node = node
+        self.platform = platform
+
+    @property
+    def type(self) -> str:
+        return self.node.get("class") or self.node.get("type") or self.node.tag
+
+    @property
+    def resource_id(self) -> str:
+        if self.platform == "iOS":
+            return self.node.get("name")
+        return self.node.get("resource-id")
+
+    @property
+    def accessibility_id(self) -> str:
+        if self.platform == "iOS":
+            return self.node.get("name")
+        return self.node.get("content-desc")
+
+    @property
+    def text(self) -> str:
+        if self.platform == "iOS":
+            text = self.node.get("label") or self.node.get("value")
+        else:
+            text = self.node.get("text")
+        return text or ""
+
+    @property
+    def text_content(self) -> str:
+        """text of a container like a card, its own text if it has any, otherwise what it shows through its children"""
+        if self.text:
+            return self.text
+        if self.platform != "iOS" and self.node.get("content-desc"):
+            return self.node.get("content-desc")
+        texts = [HierarchyElement(child, self.platform).text for child in self.node.iter() if child is not self.node]
+        return ", ".join([text for text in texts if text])
+
+    def get_attribute(self, name):
+        return self.node.get(name)
+
+
+class HierarchyIndex():
+
+    def __init__(self, root, platform):
+        self.platform = platform
+        self.elements = []
+        self._by_id = {}
+        self._by_accessibility_id = {}
+        self._by_text = {}
+        self._by_type = {}
+        for node in root.iter():
+            element = HierarchyElement(node, platform)
+            self.elements.append(element)
+            if element.resource_id:
+                self._by_id.setdefault(element.resource_id, []).append(element)
+                # Appium matches ids with or without the "package:id/" prefix on Android
+                if ":id/" in element.resource_id:
+                    self._by_id.setdefault(element.resource_id.split(":id/", 1)[1], []).append(element)
+            if element.accessibility_id:
+                self._by_accessibility_id.setdefault(element.accessibility_id, []).append(element)
+            if element.text:
+                self._by_text.setdefault(element.text, []).append(element)
+            self._by_type.setdefault(element.type, []).append(element)
+
+    def can_resolve(self, locator_tpl: tuple) -> bool:
+        """xpath and other strategies need the driver, only id, accessibility id, class name and name are indexed"""
+        return locator_tpl[0] in (AppiumBy.ID, AppiumBy.ACCESSIBILITY_ID, AppiumBy.CLASS_NAME, AppiumBy.NAME)
+
+    def find_all(self, locator_tpl: tuple) -> list:
+        (by, value) = locator_tpl
+        if by == AppiumBy.ID:
+            return list(self._by_id.get(value, []))
+        elif by == AppiumBy.ACCESSIBILITY_ID:
+            return list(self._by_accessibility_id.get(value, []))
+        elif by == AppiumBy.CLASS_NAME:
+            return list(self._by_type.get(value, []))
+        elif by == AppiumBy.NAME:
+            # name is the accessibility id on iOS, fall back to the text on Android
+            elements = list(self._by_accessibility_id.get(value, []))
+            return elements + [element for element in self._by_text.get(value, []) if element not in elements]
+        raise Exception(f"Locator strategy {by} can not be resolved from the page source index")
+
+    def find_all_by_text(self, text) -> list:
+        return list(self._by_text.get(text, []))
+
+    def exists(self, locator_tpl: tuple) -> bool:
+        return len(self.find_all(locator_tpl)) > 0
+
+    def count(self, locator_tpl: tuple) -> int:
+        return len(self.find_all(locator_tpl))
+
+    def get_text(self, locator_tpl: tuple) -> str:
+        elements = self.find_all(locator_tpl)
+        if len(elements) == 0:
+            raise Exception(f"Could not find element {locator_tpl[0]} with Locator {locator_tpl[1]} in the page source")
+        return elements[0].text
@@ -0,0 +1,101 @@
+"""
+Watcher for modals and alerts that can interrupt any screen, like the Welcome to BC Wallet modal.
+Page objects declare the modals that can pop up over them, with a handler that dismisses the modal
+or escalates it by raising, in an interruptive_modals class attribute:
+
+    interruptive_modals = [(WelcomeToBCWalletModal, WelcomeToBCWalletModal.select_dismiss)]
+
+Every page source the page source snapshot fetches anyway is checked for the registered modals, so
+steps no longer pay a negative wait to make sure a modal is not there. A page's modals are only watched
+for while that page is waiting on the screen, so one page's escalation never fires from another page's wait.
+"""
+
+import logging
+from contextlib import contextmanager
+from pageobjects.page_source_snapshot import PageSourceSnapshot
+
+
+class ModalWatcher():
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._handlers = {}
+        # page class -> {modal class: handler}, and the page classes waiting on the screen, innermost last
+        self._page_handlers = {}
+        self._active_pages = []
+        self._handling = False
+        self.handled = {}
+        self.snapshot = PageSourceSnapshot.for_driver(driver)
+        self.snapshot.add_fetch_listener(self._on_page_source)
+
+    @classmethod
+    def for_driver(cls, driver):
+        """return the watcher for driver, creating it on first use"""
+        watcher = getattr(driver, "_modal_watcher", None)
+        if watcher is None:
+            watcher = cls(driver)
+            driver._modal_watcher = watcher
+        return watcher
+
+    def register(self, modal_class, handler):
+        """handler(modal) is called with a modal_class page object whenever the modal is seen, on any page"""
+        self._handlers[modal_class] = handler
+
+    def register_page(self, page_class):
+        """collect the interruptive_modals declared by page_class and the classes it inherits from, watched for while page_class is active"""
+        if page_class in self._page_handlers:
+            return
+        handlers = {}
+        for klass in reversed(page_class.__mro__):
+            for (modal_class, handler) in vars(klass).get("interruptive_modals", []):
+                handlers[modal_class] = handler
+        self._page_handlers[page_class] = handlers
+
+    @contextmanager
+    def watching(self, page_class):
+        """make page_class the active page, so its modals are handled, while a page object of that class reads the screen"""
+        self.register_page(page_class)
+        self._active_pages.append(page_class)
+        try:
+            yield
+        finally:
+            self._active_pages.pop()
+
+    def active_handlers(self) -> dict:
+        handlers = dict(self._handlers)
+        if self._active_pages:
+            handlers.update(self._page_handlers[self._active_pages[-1]])
+        return handlers
+
+    def _on_page_source(self, snapshot) -> bool:
+        """check a freshly fetched page source, return True if a modal was handled and the screen changed"""
+        handlers = self.active_handlers()
+        if self._handling or not handlers:
+            return False
+        # Imported here as the classifier imports every page object, which all create a watcher
+        from pageobjects.screen_classifier import screen_registry
+        modal_class = screen_registry.classify(snapshot.get(), snapshot.get_index(self._platform()), list(handlers))
+        if modal_class is None:
+            return False
+        self._handling = True
+        try:
+            logging.info(f"{modal_class.__name__} is displayed, handling it")
+            self.handled[modal_class.__name__] = self.handled.get(modal_class.__name__, 0) + 1
+            handlers[modal_class](modal_class(self.driver))
+        finally:
+            self._handling = False
+        return True
+
+    def _platform(self):
+        return self.driver.capabilities['platformName']
+
+    def check(self) -> bool:
+        """check the current screen for registered modals now, reusing the snapshot if it is fresh"""
+        if self.snapshot.is_fresh():
+            return self._on_page_source(self.snapshot)
+        handled = sum(self.handled.values())
+        self.snapshot.get(refresh=True)
+        return sum(self.handled.values()) > handled
+
+    def report(self) -> str:
+        return f"Modal watcher handled: {self.handled}"
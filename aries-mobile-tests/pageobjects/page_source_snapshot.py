@@ -0,0 +1,124 @@
+"""
+Snapshot of the app's page source shared by every page object on one driver.
+Fetching the page source is one of the slowest Appium calls, especially on cloud iOS devices, so
+checks made between two driver actions reuse the same XML dump. Any driver command that can change
+the screen (click, send_keys, scroll, execute_script, ...) throws the snapshot away.
+"""
+
+import threading
+import time
+import xml.etree.ElementTree as ET
+from decouple import config
+from pageobjects.hierarchy_index import HierarchyIndex
+
+# WebDriver commands that only read from the app, anything else may change what is on the screen
+READ_ONLY_COMMANDS = {
+    "getPageSource",
+    "findElement",
+    "findElements",
+    "findChildElement",
+    "findChildElements",
+    "getElementText",
+    "getElementAttribute",
+    "getElementProperty",
+    "getElementTagName",
+    "getElementRect",
+    "isElementSelected",
+    "isElementEnabled",
+    "isElementDisplayed",
+    "getWindowRect",
+    "getWindowSize",
+    "screenshot",
+    "elementScreenshot",
+    "getCurrentUrl",
+    "getTitle",
+    "getCurrentContext",
+    "getContexts",
+    "getSettings",
+}
+
+
+class PageSourceSnapshot():
+
+    def __init__(self, driver, max_age=1.0):
+        self.driver = driver
+        # The app can still change on its own between actions, so a snapshot is only trusted this long
+        self.max_age = max_age
+        self._source = None
+        self._root = None
+        self._index = None
+        self._taken_at = 0.0
+        self._lock = threading.RLock()
+        self.fetches = 0
+        self.reuses = 0
+        self._fetch_listeners = []
+        self._wrap_driver_execute()
+
+    @classmethod
+    def for_driver(cls, driver):
+        """return the snapshot shared by every page object using driver, creating it on first use"""
+        snapshot = getattr(driver, "_page_source_snapshot", None)
+        if snapshot is None:
+            snapshot = cls(driver, max_age=config('PAGE_SOURCE_SNAPSHOT_MAX_AGE', default=1.0, cast=float))
+            driver._page_source_snapshot = snapshot
+        return snapshot
+
+    def _wrap_driver_execute(self):
+        execute = self.driver.execute
+
+        def execute_and_invalidate(driver_command, params=None):
+            if driver_command not in READ_ONLY_COMMANDS:
+                self.invalidate()
+            return execute(driver_command, params)
+
+        # WebElements send their commands through their parent driver, so element clicks are covered too
+        self.driver.execute = execute_and_invalidate
+
+    def add_fetch_listener(self, listener):
+        """listener(snapshot) is called after every fetch and returns True if it changed the screen, like dismissing a modal"""
+        self._fetch_listeners.append(listener)
+
+    def invalidate(self):
+        with self._lock:
+            self._source = None
+            self._root = None
+            self._index = None
+
+    def is_fresh(self) -> bool:
+        return self._source is not None and time.monotonic() - self._taken_at < self.max_age
+
+    def get(self, refresh=False) -> str:
+        """return the page source, fetching it only if there is no fresh snapshot or refresh is asked for"""
+        with self._lock:
+            if not refresh and self.is_fresh():
+                self.reuses += 1
+                return self._source
+            # A listener that changed the screen makes the fetch stale, fetch again, but don't loop forever
+            for attempt in range(3):
+                self._source = self.driver.page_source
+                self._root = None
+                self._index = None
+                self._taken_at = time.monotonic()
+                self.fetches += 1
+                if not any([listener(self) for listener in self._fetch_listeners]):
+                    break
+            return self._source
+
+    def get_root(self, refresh=False):
+        """return the parsed page source of the snapshot"""
+        with self._lock:
+            source = self.get(refresh)
+            if self._root is None:
+                self._root = ET.fromstring(source.encode('utf-8'))
+            return self._root
+
+    def get_index(self, platform, refresh=False):
+        """return the HierarchyIndex of the snapshot, built once per page source"""
+        with self._lock:
+            root = self.get_root(refresh)
+            if self._index is None:
+                self._index = HierarchyIndex(root, platform)
+            return self._index
+
+    def report(self) -> str:
+        return f"Page source snapshot: {self.fetches} fetches, {self.reuses} reused"
@@ -0,0 +1,127 @@
+"""
+Work out which screen the app is on from one page source snapshot.
+Every page object under pageobjects/bc_wallet and pageobjects/bifold gets a fingerprint, the locators
+that identify it. A page can declare them in a screen_fingerprint class attribute, otherwise the
+on_this_page_locator, on_this_page_text_locator and title_locator it defines itself are used.
+Steps that used to probe several pages one after the other, paying a full timeout for every page
+the app was not on, can classify the screen once and branch on the answer.
+"""
+
+import importlib
+import logging
+import os
+import pkgutil
+from appium.webdriver.common.appiumby import AppiumBy
+from pageobjects.basepage import BasePage
+
+SCREEN_PACKAGES = ["pageobjects.bc_wallet", "pageobjects.bifold"]
+
+
+class ScreenFingerprint():
+
+    def __init__(self, page_class, locators):
+        self.page_class = page_class
+        self.locators = locators
+
+    @staticmethod
+    def _specificity(locator) -> int:
+        # Test ids are the most reliable, then accessibility ids, then text that appears on the page
+        if type(locator) is tuple:
+            return 1000 if locator[0] == AppiumBy.ID else 500
+        return len(locator)
+
+    def match(self, page_source, index) -> int:
+        """return how specific the best matching locator is, 0 if none of them match"""
+        best = 0
+        for locator in self.locators:
+            if type(locator) is tuple:
+                matched = index.can_resolve(locator) and index.exists(locator)
+            else:
+                matched = locator in page_source
+            if matched:
+                best = max(best, self._specificity(locator))
+        return best
+
+
+def fingerprint_locators(page_class) -> list:
+    """return the locators identifying page_class, only looking at what the class itself declares"""
+    own = vars(page_class)
+    if "screen_fingerprint" in own:
+        return list(own["screen_fingerprint"])
+    locators = []
+    for name in ("on_this_page_locator", "on_this_page_text_locator", "title_locator"):
+        locator = own.get(name)
+        if type(locator) is tuple or (type(locator) is str and locator):
+            locators.append(locator)
+    return locators
+
+
+class ScreenRegistry():
+
+    def __init__(self, packages=None):
+        self.packages = packages if packages is not None else SCREEN_PACKAGES
+        self._fingerprints = None
+
+    def register(self, page_class, locators=None):
+        """add or replace the fingerprint of page_class"""
+        fingerprints = self.get_fingerprints()
+        fingerprints[page_class] = ScreenFingerprint(page_class, locators if locators is not None else fingerprint_locators(page_class))
+
+    def get_fingerprints(self) -> dict:
+        if self._fingerprints is None:
+            self._fingerprints = {}
+            for page_class in self._discover_page_classes():
+                locators = fingerprint_locators(page_class)
+                if locators:
+                    self._fingerprints[page_class] = ScreenFingerprint(page_class, locators)
+        return self._fingerprints
+
+    def _discover_page_classes(self) -> list:
+        page_classes = []
+        for package in self.packages:
+            package_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), *package.split("."))
+            for module_info in pkgutil.iter_modules([package_dir]):
+                module_name = f"{package}.{module_info.name}"
+                try:
+                    module = importlib.import_module(module_name)
+                except Exception as e:
+                    logging.info(f"Screen classifier skipping {module_name}, it could not be imported: {e}")
+                    continue
+                for value in vars(module).values():
+                    if isinstance(value, type) and issubclass(value, BasePage) and value.__module__ == module_name:
+                        page_classes.append(value)
+        return page_classes
+
+    def classify(self, page_source, index, candidates=None):
+        """return the page class that best matches the page source, None if nothing matches"""
+        fingerprints = self.get_fingerprints()
+        if candidates is not None:
+            fingerprints = {page_class: fingerprints.get(page_class) or ScreenFingerprint(page_class, fingerprint_locators(page_class)) for page_class in candidates}
+        best_class = None
+        best_score = 0
+        for (page_class, fingerprint) in fingerprints.items():
+            score = fingerprint.match(page_source, index)
+            if score > best_score:
+                best_class = page_class
+                best_score = score
+        return best_class
+
+
+screen_registry = ScreenRegistry()
+
+
+def classify_current_screen(driver, candidates=None, timeout=0, refresh=False):
+    """
+    return a page object for the screen the app is on, None if no known screen matches.
+    candidates limits the answer to the given page classes. With a timeout the screen is polled until
+    one of them matches, otherwise only the current page source snapshot is looked at.
+    """
+    page = BasePage(driver)
+
+    def classify(refresh):
+        return screen_registry.classify(page.get_page_source(refresh), page.get_hierarchy_index(), candidates)
+
+    page_class = page._poll(classify, timeout) if timeout > 0 else classify(refresh)
+    if page_class is None:
+        return None
+    return page_class(driver)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Run the selected scenarios across several behave workers, each with its own device session.
+Takes the same arguments as behave. The scenarios the tags select are split into one shard per worker,
+every worker is a separate behave process, so it has its own device service handler, issuer and verifier
+interfaces, and writes to its own output directory. Allure results are merged into the -o directory given
+on the command line when all workers are done.
+
+    ./parallel_runner.py --workers 4 --tags=@bc_wallet -f allure_behave.formatter:AllureFormatter -o ./allure/allure-results
+
+The number of workers comes from --workers or PARALLEL_WORKERS and is capped by DEVICE_SERVICE_CONCURRENCY,
+the number of sessions the device service account allows, when that is set.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from behave.configuration import Configuration
+from behave.runner_util import collect_feature_locations, parse_features
+from decouple import config
+
+WORKER_RESULTS_DIR = "results"
+
+
+def select_scenarios(behave_args: list) -> list:
+    """return the scenarios behave would run with these arguments, in the order it would run them"""
+    behave_config = Configuration(command_args=behave_args)
+    feature_locations = collect_feature_locations(behave_config.paths or ["features"])
+    features = parse_features(feature_locations, language=behave_config.lang)
+    return [
+        scenario for feature in features for scenario in feature.walk_scenarios() if scenario.should_run(behave_config)
+    ]
+
+
+def scenario_weight(scenario) -> int:
+    """rough cost of a scenario, the number of steps it runs including the background"""
+    background_steps = scenario.feature.background.steps if scenario.feature.background else []
+    return len(background_steps) + len(scenario.steps)
+
+
+def shard_scenarios(scenarios: list, workers: int) -> list:
+    """split scenarios into balanced shards, heaviest first onto the lightest shard, keeping file order within a shard"""
+    shards = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for scenario in sorted(scenarios, key=scenario_weight, reverse=True):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(scenario)
+        loads[lightest] += scenario_weight(scenario)
+    order = {id(scenario): position for (position, scenario) in enumerate(scenarios)}
+    return [sorted(shard, key=lambda scenario: order[id(scenario)]) for shard in shards if shard]
+
+
+def worker_count(requested: int) -> int:
+    concurrency = config('DEVICE_SERVICE_CONCURRENCY', default=0, cast=int)
+    if concurrency > 0 and requested > concurrency:
+        print(f"Only {concurrency} device sessions are allowed, running {concurrency} workers instead of {requested}")
+        return concurrency
+    return max(requested, 1)
+
+
+def output_args(behave_args: list) -> list:
+    """return the -o outputs given to behave"""
+    outputs = []
+    for (position, arg) in enumerate(behave_args):
+        if arg in ("-o", "--outfile") and position + 1 < len(behave_args):
+            outputs.append(behave_args[position + 1])
+        elif arg.startswith("--outfile="):
+            outputs.append(arg.split("=", 1)[1])
+    return outputs
+
+
+def worker_output(output: str, worker: int) -> str:
+    # Allure writes into a directory, other formatters write a file
+    if os.path.isdir(output):
+        return os.path.join(output, f"worker-{worker}")
+    return f"{output}.worker-{worker}"
+
+
+def worker_args(behave_args: list, paths: list, worker: int) -> list:
+    """return the behave arguments for a worker, without the feature paths and with its own outputs"""
+    args = []
+    for (position, arg) in enumerate(behave_args):
+        if position > 0 and behave_args[position - 1] in ("-o", "--outfile"):
+            args.append(worker_output(arg, worker))
+        elif arg.startswith("--outfile="):
+            args.append(f"--outfile={worker_output(arg.split('=', 1)[1], worker)}")
+        elif arg not in paths:
+            args.append(arg)
+    return args
+
+
+def worker_environment(worker: int, workers: int) -> dict:
+    env = dict(os.environ)
+    env['PARALLEL_WORKER'] = str(worker)
+    # Give every worker its share of the device service sessions, so it only prepares sessions ahead when its share allows
+    concurrency = config('DEVICE_SERVICE_CONCURRENCY', default=0, cast=int)
+    if concurrency > 0:
+        env['DEVICE_SERVICE_CONCURRENCY'] = str(max(concurrency // workers, 1))
+    # Every worker runs its own webhook listener, they can't share a port
+    webhook_port = config('AGENT_WEBHOOK_LISTENER_PORT', default=0, cast=int)
+    if webhook_port != 0:
+        env['AGENT_WEBHOOK_LISTENER_PORT'] = str(webhook_port + worker)
+    return env
+
+
+def start_worker(worker: int, workers: int, shard: list, args: list) -> tuple:
+    worker_dir = os.path.join(WORKER_RESULTS_DIR, f"worker-{worker}")
+    os.makedirs(worker_dir, exist_ok=True)
+    locations = [str(scenario.location) for scenario in shard]
+    log_file = open(os.path.join(worker_dir, "behave.log"), "w")
+    print(f"Worker {worker}: {len(shard)} scenarios, log in {log_file.name}")
+    process = subprocess.Popen(["behave"] + args + locations, stdout=log_file, stderr=subprocess.STDOUT, env=worker_environment(worker, workers))
+    return (process, log_file)
+
+
+def merge_results(outputs: list, workers: int):
+    """move every worker's result files into the output directory that was asked for"""
+    for output in [output for output in outputs if os.path.isdir(output)]:
+        for worker in range(workers):
+            worker_dir = worker_output(output, worker)
+            if not os.path.isdir(worker_dir):
+                continue
+            for file_name in os.listdir(worker_dir):
+                # Allure result files have unique names, anything else would clash and is kept per worker
+                target = os.path.join(output, file_name)
+                if os.path.exists(target):
+                    target = os.path.join(output, f"worker-{worker}-{file_name}")
+                shutil.move(os.path.join(worker_dir, file_name), target)
+            os.rmdir(worker_dir)
+
+
+def run(behave_args: list, requested_workers: int) -> int:
+    scenarios = select_scenarios(behave_args)
+    if not scenarios:
+        print("No scenarios selected")
+        return 0
+    workers = min(worker_count(requested_workers), len(scenarios))
+    shards = shard_scenarios(scenarios, workers)
+    paths = Configuration(command_args=behave_args).paths
+    outputs = output_args(behave_args)
+    print(f"Running {len(scenarios)} scenarios on {len(shards)} workers")
+
+    started_at = time.monotonic()
+    running = [
+        start_worker(worker, len(shards), shard, worker_args(behave_args, paths, worker)) for (worker, shard) in enumerate(shards)
+    ]
+    exit_code = 0
+    for (worker, (process, log_file)) in enumerate(running):
+        returncode = process.wait()
+        log_file.close()
+        print(f"Worker {worker} finished with exit code {returncode}")
+        with open(log_file.name) as log:
+            print(log.read())
+        exit_code = exit_code or returncode
+
+    merge_results(outputs, len(shards))
+    print(f"All workers finished in {time.monotonic() - started_at:.0f} seconds")
+    return exit_code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run behave scenarios across parallel workers", add_help=False)
+    parser.add_argument("--workers", type=int, default=config('PARALLEL_WORKERS', default=1, cast=int))
+    (options, behave_args) = parser.parse_known_args()
+    sys.exit(run(behave_args, options.workers))
@@ -0,0 +1,121 @@
+"""
+Shared queue of the scenarios of a distributed run, backed by a SQLite file every worker can reach.
+The coordinator publishes the scenarios, workers on any node claim the next ones whenever they are free
+and report the result of each scenario back. Claims are leased, a worker that reports a result renews the
+lease on the rest of its claims, so a claim that is not finished in time because its worker died or hung
+goes back to the queue and is stolen by the next free worker.
+"""
+
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+class ScenarioQueue():
+
+    def __init__(self, path, lease=1800.0, max_attempts=2):
+        self.path = path
+        self.lease = lease
+        self.max_attempts = max_attempts
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit, transactions are started explicitly where claims need to be atomic across workers
+        connection = sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+        try:
+            yield connection
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def publish(self, scenarios: list):
+        """replace the queue with scenarios, a list of (location, name, weight)"""
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DROP TABLE IF EXISTS scenarios")
+            connection.execute(
+                "CREATE TABLE scenarios (location TEXT PRIMARY KEY, name TEXT, weight INTEGER, position INTEGER,"
+                " state TEXT, worker TEXT, attempts INTEGER, claimed_at REAL, duration REAL)"
+            )
+            connection.executemany(
+                "INSERT INTO scenarios VALUES (?, ?, ?, ?, 'pending', NULL, 0, NULL, NULL)",
+                [(location, name, weight, position) for (position, (location, name, weight)) in enumerate(scenarios)],
+            )
+            connection.execute("COMMIT")
+
+    def claim(self, worker: str, count=1) -> list:
+        """claim up to count scenarios for worker, heaviest first, and return their locations"""
+        now = time.time()
+        expired = now - self.lease
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            # Give up on scenarios whose workers keep dying on them
+            connection.execute(
+                "UPDATE scenarios SET state = 'error' WHERE state = 'claimed' AND claimed_at < ? AND attempts >= ?",
+                (expired, self.max_attempts),
+            )
+            locations = [row[0] for row in connection.execute(
+                "SELECT location FROM scenarios WHERE state = 'pending' OR (state = 'claimed' AND claimed_at < ?)"
+                " ORDER BY weight DESC, position LIMIT ?",
+                (expired, count),
+            )]
+            connection.executemany(
+                "UPDATE scenarios SET state = 'claimed', worker = ?, attempts = attempts + 1, claimed_at = ? WHERE location = ?",
+                [(worker, now, location) for location in locations],
+            )
+            connection.execute("COMMIT")
+        return locations
+
+    def report(self, location: str, worker: str, status: str, duration: float):
+        """record the result of a scenario and renew the lease on the worker's other claims"""
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE scenarios SET state = ?, worker = ?, duration = ? WHERE location = ?",
+                (status, worker, duration, location),
+            )
+            connection.execute(
+                "UPDATE scenarios SET claimed_at = ? WHERE worker = ? AND state = 'claimed'", (time.time(), worker)
+            )
+
+    def release(self, worker: str, locations: list):
+        """put back the scenarios of a finished batch that never reported a result, like when behave crashed"""
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            for location in locations:
+                connection.execute(
+                    "UPDATE scenarios SET state = CASE WHEN attempts >= ? THEN 'error' ELSE 'pending' END"
+                    " WHERE location = ? AND worker = ? AND state = 'claimed'",
+                    (self.max_attempts, location, worker),
+                )
+            connection.execute("COMMIT")
+
+    def is_done(self) -> bool:
+        with self._connect() as connection:
+            (unfinished,) = connection.execute(
+                "SELECT COUNT(*) FROM scenarios WHERE state IN ('pending', 'claimed')"
+            ).fetchone()
+        return unfinished == 0
+
+    def results(self) -> list:
+        """return (location, name, state, worker, attempts, duration) for every scenario, in the order they were published"""
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT location, name, state, worker, attempts, duration FROM scenarios ORDER BY position"
+            ).fetchall()
+
+    def workers(self) -> list:
+        return sorted({worker for (_, _, _, worker, _, _) in self.results() if worker})
+
+    def summary(self) -> str:
+        results = self.results()
+        states = {}
+        for (_, _, state, _, _, _) in results:
+            states[state] = states.get(state, 0) + 1
+        lines = [f"Scenario queue: {len(results)} scenarios, " + ", ".join([f"{count} {state}" for (state, count) in sorted(states.items())])]
+        for worker in self.workers():
+            durations = [duration or 0.0 for (_, _, _, by, _, duration) in results if by == worker]
+            lines.append(f"  {worker}: {len(durations)} scenarios, {sum(durations):.0f} seconds")
+        return "\n".join(lines)
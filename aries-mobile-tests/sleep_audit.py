@@ -0,0 +1,70 @@
+"""
+Audit of the unconditional sleeps left in the test harness.
+Fixed pauses are slow when the app is fast and flaky when it is slow, so waits should be on a
+condition. install_sleep_audit() replaces time.sleep with a version that records every sleep made
+from code in this tree, with its call site and the total time spent there, so the ones that remain
+show up in the run output.
+Condition based waits that back off between polls use poll_sleep, which is not audited.
+"""
+
+import os
+import sys
+import threading
+import time
+
+# The real time.sleep, for polling loops that wait on a condition
+poll_sleep = time.sleep
+
+_harness_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+class SleepAudit():
+
+    def __init__(self, root_dir=_harness_dir):
+        self.root_dir = root_dir
+        self.call_sites = {}
+        self._lock = threading.Lock()
+
+    def _call_site(self):
+        # Frame 0 is this method, 1 is audited_sleep, 2 is whoever called time.sleep
+        frame = sys._getframe(2)
+        if frame.f_code.co_filename.startswith("<"):
+            return None
+        file_name = os.path.abspath(frame.f_code.co_filename)
+        if not file_name.startswith(self.root_dir + os.sep) or file_name == os.path.abspath(__file__):
+            return None
+        return f"{os.path.relpath(file_name, self.root_dir)}:{frame.f_lineno}"
+
+    def record(self, call_site, seconds):
+        with self._lock:
+            (count, total) = self.call_sites.get(call_site, (0, 0.0))
+            self.call_sites[call_site] = (count + 1, total + seconds)
+
+    def audited_sleep(self, seconds):
+        call_site = self._call_site()
+        if call_site is not None:
+            self.record(call_site, seconds)
+        poll_sleep(seconds)
+
+    def total(self) -> float:
+        return sum([total for (count, total) in self.call_sites.values()])
+
+    def report(self) -> str:
+        if not self.call_sites:
+            return "Sleep audit: no unconditional sleeps"
+        lines = [f"Sleep audit: {self.total():.1f} seconds in unconditional sleeps"]
+        for (call_site, (count, total)) in sorted(self.call_sites.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"  {call_site}: {count} calls, {total:.1f} seconds")
+        return "\n".join(lines)
+
+
+sleep_audit = SleepAudit()
+
+
+def install_sleep_audit():
+    """
+    patch time.sleep to record the sleeps made from this tree. Install it before the page objects and
+    agent interfaces are imported, so their "from time import sleep" picks up the audited version.
+    """
+    time.sleep = sleep_audit.audited_sleep
+    return sleep_audit
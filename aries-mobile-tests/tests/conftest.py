@@ -0,0 +1,9 @@
+"""
+Unit tests for the harness plumbing, run with python -m pytest tests from aries-mobile-tests.
+The harness modules import each other as top level modules, like behave runs them.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
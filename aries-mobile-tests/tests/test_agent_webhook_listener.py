@@ -0,0 +1,108 @@
+"""
+The webhook listener against a local stand-in for an AATH backchannel. The stand-in reports the
+connection as still in progress to every poll, so a wait can only end early on the pushed webhook.
+"""
+
+import asyncio
+import aiohttp
+import pytest
+from aiohttp import web
+from agent_controller_client import agent_controller_transport, agent_webhook_listener, wait_for_agent_event_or_state_async
+
+CONNECTION_ACTIVE = {"connection_id": "connection-1", "state": "active"}
+
+
+@pytest.fixture
+def backchannel():
+    """(url, polled connection ids) of a stand-in backchannel whose connections never complete"""
+    polls = []
+
+    async def get_connection(request):
+        polls.append(request.match_info["id"])
+        return web.json_response({"connection_id": request.match_info["id"], "state": "request"})
+
+    async def start():
+        app = web.Application()
+        app.router.add_get("/agent/command/connection/{id}", get_connection)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        return runner
+
+    runner = agent_controller_transport.run(start())
+    yield (f"http://127.0.0.1:{runner.addresses[0][1]}", polls)
+    agent_controller_transport.run(runner.cleanup())
+
+
+@pytest.fixture
+def agent(request):
+    """(agent id, webhook url) of an agent registered with the listener, the url the agent would be configured with"""
+    # Each test gets its own agent id so it does not see the events posted by the tests before it
+    agent_id = request.node.name
+    agent_webhook_listener.host = "127.0.0.1"
+    agent_webhook_listener.start()
+    yield (agent_id, agent_webhook_listener.register(agent_id))
+    agent_webhook_listener.stop()
+
+
+async def post_webhook(webhook_url, topic, payload, delay=0.0):
+    """post a webhook the way ACA-Py does"""
+    await asyncio.sleep(delay)
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"{webhook_url}/topic/{topic}/", json=payload) as resp:
+            assert resp.status == 200
+
+
+async def wait_for_connection_active(agent_id, backchannel_url, timeout=10.0):
+    return await wait_for_agent_event_or_state_async(
+        agent_id,
+        ["connections"],
+        lambda payload: payload.get("connection_id") == "connection-1" and payload.get("state") == "active",
+        backchannel_url + "/agent/command/",
+        "connection",
+        lambda resp_json: resp_json.get("state") == "complete",
+        id="connection-1",
+        timeout=timeout,
+    )
+
+
+def test_pushed_event_resolves_the_wait(backchannel, agent):
+    (backchannel_url, polls) = backchannel
+    (agent_id, webhook_url) = agent
+
+    async def wait_while_the_agent_posts():
+        (result, _) = await asyncio.gather(
+            wait_for_connection_active(agent_id, backchannel_url),
+            post_webhook(webhook_url, "connections", CONNECTION_ACTIVE, delay=0.5),
+        )
+        return result
+
+    result = agent_controller_transport.run(wait_while_the_agent_posts())
+
+    assert result.matched
+    assert result.resp_json == CONNECTION_ACTIVE
+    assert result.elapsed < 5.0
+    # The backchannel is still polled alongside, in case the webhook never comes
+    assert polls == ["connection-1"]
+
+
+def test_event_received_before_the_wait_resolves_it(backchannel, agent):
+    (backchannel_url, _) = backchannel
+    (agent_id, webhook_url) = agent
+    agent_controller_transport.run(post_webhook(webhook_url, "connections", CONNECTION_ACTIVE))
+
+    result = agent_controller_transport.run(wait_for_connection_active(agent_id, backchannel_url))
+
+    assert result.matched
+    assert result.resp_json == CONNECTION_ACTIVE
+
+
+def test_events_on_other_topics_do_not_resolve_the_wait(backchannel, agent):
+    (backchannel_url, _) = backchannel
+    (agent_id, webhook_url) = agent
+    agent_controller_transport.run(post_webhook(webhook_url, "issue_credential", CONNECTION_ACTIVE))
+
+    result = agent_controller_transport.run(wait_for_connection_active(agent_id, backchannel_url, timeout=1.0))
+
+    assert not result.matched
+    assert result.resp_json == {"connection_id": "connection-1", "state": "request"}
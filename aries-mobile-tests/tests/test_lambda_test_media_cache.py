@@ -0,0 +1,86 @@
+"""
+The LambdaTest media cache against a local stand-in for the LAMBDA_TEST_MEDIA_UPLOAD_URL endpoint,
+which hands out a new media_url for every upload it gets.
+"""
+
+import asyncio
+import pytest
+from aiohttp import web
+from agent_controller_client import agent_controller_transport
+from agent_test_utils import QRCodeImage
+from device_service_handler.lambda_test_media_cache import LambdaTestMediaCache
+
+
+@pytest.fixture
+def upload_endpoint():
+    """(url, uploaded pngs) of a stand-in LambdaTest media upload endpoint"""
+    uploads = []
+
+    async def upload(request):
+        if request.headers.get("Authorization") is None:
+            return web.Response(status=401, text="missing credentials")
+        form = await request.post()
+        uploads.append(form["media_file"].file.read())
+        # Slow enough that uploads asked for together overlap
+        await asyncio.sleep(0.1)
+        return web.json_response({"media_url": f"lt://MEDIA{len(uploads)}"})
+
+    async def start():
+        app = web.Application()
+        app.router.add_post("/upload", upload)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", 0).start()
+        return runner
+
+    runner = agent_controller_transport.run(start())
+    yield (f"http://127.0.0.1:{runner.addresses[0][1]}/upload", uploads)
+    agent_controller_transport.run(runner.cleanup())
+
+
+def test_repeated_image_is_uploaded_once(upload_endpoint):
+    (url, uploads) = upload_endpoint
+    media_cache = LambdaTestMediaCache(url, "user", "key")
+    image = QRCodeImage(b"qr code png")
+
+    first_media_url = media_cache.get_media_url(image)
+    # The same picture again, as the base64 string older agents hand over
+    second_media_url = media_cache.get_media_url(image.base64)
+
+    assert first_media_url == second_media_url == "lt://MEDIA1"
+    assert uploads == [b"qr code png"]
+
+
+def test_image_asked_for_while_it_uploads_is_uploaded_once(upload_endpoint):
+    (url, uploads) = upload_endpoint
+    media_cache = LambdaTestMediaCache(url, "user", "key")
+    image = QRCodeImage(b"qr code png")
+
+    async def preupload_and_inject():
+        return await asyncio.gather(media_cache.get_media_url_async(image), media_cache.get_media_url_async(image))
+
+    media_urls = agent_controller_transport.run(preupload_and_inject())
+
+    assert media_urls == ["lt://MEDIA1", "lt://MEDIA1"]
+    assert len(uploads) == 1
+
+
+def test_different_images_are_each_uploaded(upload_endpoint):
+    (url, uploads) = upload_endpoint
+    media_cache = LambdaTestMediaCache(url, "user", "key")
+
+    media_urls = [media_cache.get_media_url(QRCodeImage(png)) for png in (b"first qr code", b"second qr code")]
+
+    assert media_urls == ["lt://MEDIA1", "lt://MEDIA2"]
+    assert uploads == [b"first qr code", b"second qr code"]
+
+
+def test_expired_upload_is_uploaded_again(upload_endpoint):
+    (url, uploads) = upload_endpoint
+    media_cache = LambdaTestMediaCache(url, "user", "key", ttl=0.0)
+    image = QRCodeImage(b"qr code png")
+
+    media_cache.get_media_url(image)
+    media_cache.get_media_url(image)
+
+    assert len(uploads) == 2